@@ -0,0 +1,68 @@
+"""Import-time guard for the core modules.
+
+    python benchmarks/import_time.py [--module diceroll] [--max-ms 40] [--repeat 5]
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters,
+reports the best cumulative import time, and exits non-zero if it is over
+budget, if importing printed anything, or if a heavy optional module
+(NumPy, pygame, fractions, sqlite3, json, ...) was loaded eagerly.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only load on first use of the feature that needs them
+HEAVY_MODULES = ["numpy", "pygame", "fractions", "decimal", "sqlite3", "json", "mmap",
+                 "queue", "concurrent.futures", "diceroll_prob", "diceroll_bulk",
+                 "diceroll_history", "diceroll_store", "diceroll_sim", "diceroll_anim"]
+
+
+def measure(module):
+    """Returns (cumulative microseconds, imported module names, stdout) for one cold import."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    cumulative = None
+    imported = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        _, cumulative_us, name = line.split("|")
+        name = name.strip()
+        imported.append(name)
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, imported, result.stdout
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="diceroll")
+    parser.add_argument("--max-ms", type=float, default=40.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    best_us = min(cumulative for cumulative, _, _ in runs)
+    imported, stdout = runs[0][1], runs[0][2]
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+
+    print(f"import {args.module}: best {best_us / 1000:.2f} ms of {args.repeat} (budget {args.max_ms} ms)")
+    print(f"modules loaded: {len(imported)}")
+    failures = []
+    if best_us / 1000 > args.max_ms:
+        failures.append("over import-time budget")
+    if heavy:
+        failures.append("heavy modules imported eagerly: " + ", ".join(heavy))
+    if stdout:
+        failures.append(f"import printed output: {stdout.strip()!r}")
+    for failure in failures:
+        print("FAIL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Dice per second for each RNG backend, single rolls and bulk rolls.
+
+    python benchmarks/rng_backends.py [--notation 10d6] [--rolls 100000] [--seed 1]
+
+Backends that cannot run here (NumPy not installed) are skipped.
+'secrets' is never seeded.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diceroll import DiceRoller
+from diceroll_notation import compile_notation
+from diceroll_rng import BACKENDS
+
+
+def dice_per_second(num_dice, seconds):
+    return num_dice / seconds if seconds else float("inf")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notation", default="10d6")
+    parser.add_argument("--rolls", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    num_dice = compile_notation(args.notation).num_dice * args.rolls
+
+    # Baseline: the stdlib randint every die used to go through
+    rng = random.Random(args.seed)
+    program = compile_notation(args.notation)
+    began = time.perf_counter()
+    for _ in range(args.rolls):
+        program.roll(rng.randint)
+    baseline = time.perf_counter() - began
+    print(f"{'backend':<22}{'single dice/s':>16}{'bulk dice/s':>16}")
+    print(f"{'random.randint':<22}{dice_per_second(num_dice, baseline):>16,.0f}{'-':>16}")
+
+    for backend in BACKENDS:
+        try:
+            roller = DiceRoller(seed=None if backend == "secrets" else args.seed, rng=backend)
+        except ValueError as e:
+            print(f"{backend:<22}skipped: {e}")
+            continue
+        began = time.perf_counter()
+        for _ in range(args.rolls):
+            roller.roll_dice(args.notation)
+        single = time.perf_counter() - began
+        began = time.perf_counter()
+        roller.roll_many(args.notation, args.rolls)
+        bulk = time.perf_counter() - began
+        print(f"{backend:<22}{dice_per_second(num_dice, single):>16,.0f}{dice_per_second(num_dice, bulk):>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
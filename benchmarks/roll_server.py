@@ -0,0 +1,93 @@
+"""Load generator for the HTTP roll server: latency percentiles and rolls/sec.
+
+    python benchmarks/roll_server.py [--connections 32] [--requests 200] [--rolls-per-request 10]
+                                     [--notation 4d6kh3] [--host 127.0.0.1 --port 8765]
+
+Without --port an in-process server is started on a free localhost port.
+Each connection is kept alive and sends its requests back to back.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diceroll_api import dicerollAPI
+from diceroll_server import RollServer
+
+
+async def post(reader, writer, host, path, body):
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    payload = await reader.readexactly(length)
+    if b" 200 " not in status_line:
+        raise RuntimeError(f"{status_line.decode().strip()}: {payload.decode()}")
+    return payload
+
+
+async def client(host, port, num_requests, body, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(num_requests):
+            began = time.perf_counter()
+            await post(reader, writer, host, "/roll", body)
+            latencies.append(time.perf_counter() - began)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+async def run(args):
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        server = await RollServer(dicerollAPI(seed=1), host, 0).start()
+        port = server.port
+    body = json.dumps({"rolls": [{"notation": args.notation, "target": 10}] * args.rolls_per_request}).encode()
+    latencies = []
+    began = time.perf_counter()
+    await asyncio.gather(*[client(host, port, args.requests, body, latencies) for _ in range(args.connections)])
+    elapsed = time.perf_counter() - began
+    if server is not None:
+        batches = server.batcher.batches
+        await server.close()
+
+    latencies.sort()
+    total_rolls = len(latencies) * args.rolls_per_request
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.2f}s")
+    print(f"  p50 {percentile(latencies, 50) * 1000:.2f} ms   p99 {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"  {len(latencies) / elapsed:,.0f} requests/s   {total_rolls / elapsed:,.0f} rolls/s")
+    if server is not None:
+        print(f"  {batches} roll batches ({total_rolls / max(batches, 1):.1f} rolls per batch)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per connection")
+    parser.add_argument("--rolls-per-request", type=int, default=10)
+    parser.add_argument("--notation", default="4d6kh3")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="Use a running server instead of an in-process one")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
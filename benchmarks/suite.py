@@ -0,0 +1,232 @@
+"""Benchmark suite for the roller, probability, statistics, history and animation paths.
+
+    python benchmarks/suite.py [--only roll_dice,probabilities] [--quick] [--seed 1]
+                               [--json results.json] [--compare baseline.json] [--threshold 0.15]
+
+Groups:
+    roll_dice       DiceRoller.roll_dice throughput across notation sizes
+    probabilities   get_dice_probabilities time vs dice count (cold cache)
+    statistics      get_roll_statistics at 1e3 rolls up to --max-rolls (1e7 max)
+    history         dicerollAPI history save/load, JSON and .rolls, at scale
+    animation       DiceAnimator frame time (HeadlessRenderer, dummy SDL driver)
+
+Every case is seeded and reports the best of --repeat runs as seconds per
+operation. --json writes the results; --compare reads an earlier --json
+file and exits non-zero if any case got slower than the baseline by more
+than --threshold. Groups that cannot run here (no pygame) are skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diceroll import DiceRoller, OutcomeRules
+from diceroll_api import dicerollAPI
+from diceroll_notation import compile_notation
+
+ROLL_NOTATIONS = ["1d20", "3d6+2", "4d6kh3", "10d6", "100d6", "1000d6"]
+PROBABILITY_DICE = [1, 10, 50, 100, 200]
+STATISTICS_ROLLS = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+HISTORY_ROWS = [10 ** 4, 10 ** 5]
+ANIMATION_NOTATIONS = ["1d20", "3d6", "10d6"]
+
+
+def best_of(repeat, run):
+    """Fastest wall time of run() over repeat calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        began = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - began)
+    return best
+
+
+def result(group, seconds, ops, **params):
+    return {"group": group, "seconds": seconds / ops, "ops": ops, "per_second": ops / seconds if seconds else None,
+            "params": params}
+
+
+def bench_roll_dice(args):
+    num_rolls = 10000 if args.quick else 100000
+    results = {}
+    for notation in ROLL_NOTATIONS:
+        roller = DiceRoller(seed=args.seed)
+        # Fewer rolls of the big pools, so every case rolls a similar number of dice
+        rolls = max(100, num_rolls * 10 // max(10, compile_notation(notation).num_dice))
+        roll_dice = roller.roll_dice
+
+        def run():
+            for _ in range(rolls):
+                roll_dice(notation)
+        results[f"roll_dice[{notation}]"] = result("roll_dice", best_of(args.repeat, run), rolls, notation=notation)
+    return results
+
+
+def bench_probabilities(args):
+    import diceroll_prob
+    roller = DiceRoller(seed=args.seed)
+    results = {}
+    for count in PROBABILITY_DICE[:3] if args.quick else PROBABILITY_DICE:
+        notation = f"{count}d6"
+
+        def run():
+            diceroll_prob.distribution_cache.clear() # Time the computation, not the cache hit
+            roller.get_dice_probabilities(notation)
+        results[f"probabilities[{notation}]"] = result("probabilities", best_of(args.repeat, run), 1, dice=count)
+    return results
+
+
+def bench_statistics(args):
+    roller = DiceRoller(seed=args.seed)
+    max_rolls = 10 ** 5 if args.quick else args.max_rolls
+    results = {}
+    for num_rolls in STATISTICS_ROLLS:
+        if num_rolls > max_rolls:
+            break
+        # Large sizes run once; their time is dominated by the work, not by noise
+        repeat = args.repeat if num_rolls < 10 ** 6 else 1
+        seconds = best_of(repeat, lambda: roller.get_roll_statistics("3d6", num_rolls, seed=args.seed))
+        results[f"statistics[3d6 x {num_rolls:.0e}]"] = result("statistics", seconds, num_rolls, rolls=num_rolls)
+    return results
+
+
+def bench_history(args):
+    results = {}
+    for num_rows in HISTORY_ROWS[:1] if args.quick else HISTORY_ROWS:
+        api = dicerollAPI(history_size=num_rows, seed=args.seed, log_console=False)
+        # Plain target rolls plus OutcomeRules tiers, which must survive the round trip too
+        tiered = DiceRoller(seed=args.seed, outcome_determiner=OutcomeRules(
+            [("fail", None), ("partial", -3), ("success", 0), ("crit", 10)], relative=True))
+        history = [api.dice_roller.roll_dice("3d6+2", target=12) for _ in range(num_rows - num_rows // 4)]
+        history += [tiered.roll_dice("1d20+5", target=15) for _ in range(num_rows // 4)]
+        api.dice_roller.set_roll_history(history)
+        for suffix in (".json", ".rolls"):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "history" + suffix)
+                save = best_of(args.repeat, lambda: api.save_roll_history_to_file(path))
+                loader = dicerollAPI(history_size=num_rows, log_console=False)
+                load = best_of(args.repeat, lambda: loader.load_roll_history_from_file(path))
+                loaded = loader.dice_roller.get_roll_history()
+                del loader # Releases a memory-mapped store before the directory goes
+            if loaded != history:
+                raise RuntimeError(f"history{suffix}: reloaded rolls differ from the saved ones")
+            kind = suffix[1:]
+            results[f"history_save[{kind} x {num_rows}]"] = result("history", save, num_rows, rows=num_rows, format=kind)
+            results[f"history_load[{kind} x {num_rows}]"] = result("history", load, num_rows, rows=num_rows, format=kind)
+    return results
+
+
+def bench_animation(args):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    try:
+        from diceroll_render import HeadlessRenderer
+    except ImportError as e:
+        print(f"animation: skipped ({e})")
+        return {}
+    renderer = HeadlessRenderer(frame_rate=30)
+    roller = DiceRoller(seed=args.seed)
+    results = {}
+    for notation in ANIMATION_NOTATIONS:
+        roll_result = roller.roll_dice(notation)
+        renderer.render_frames(roll_result, seed=args.seed) # Loads and scales the images once
+        num_frames = len(renderer.render_frames(roll_result, seed=args.seed))
+        seconds = best_of(args.repeat, lambda: renderer.render_frames(roll_result, seed=args.seed))
+        results[f"animation_frame[{notation}]"] = result("animation", seconds, num_frames, notation=notation)
+    return results
+
+
+GROUPS = {
+    "roll_dice": bench_roll_dice,
+    "probabilities": bench_probabilities,
+    "statistics": bench_statistics,
+    "history": bench_history,
+    "animation": bench_animation,
+}
+
+
+def environment():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "numpy": numpy_version,
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Prints each case against the baseline; returns the names that regressed."""
+    regressions = []
+    print(f"\n{'case':<36}{'baseline':>14}{'now':>14}{'change':>10}")
+    for name, case in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<36}{'-':>14}{format_seconds(case['seconds']):>14}{'new':>10}")
+            continue
+        change = case["seconds"] / old["seconds"] - 1 if old["seconds"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<36}{format_seconds(old['seconds']):>14}{format_seconds(case['seconds']):>14}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", help="comma-separated groups: " + ", ".join(GROUPS))
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a smoke run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-rolls", type=float, default=1e6, help="largest get_roll_statistics size (up to 1e7)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --json run")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before a case is flagged")
+    args = parser.parse_args(argv)
+
+    groups = args.only.split(",") if args.only else list(GROUPS)
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(unknown)}")
+
+    results = {}
+    print(f"{'case':<36}{'per op':>14}{'ops/s':>16}")
+    for group in groups:
+        for name, case in GROUPS[group](args).items():
+            results[name] = case
+            per_second = f"{case['per_second']:,.0f}" if case["per_second"] else "-"
+            print(f"{name:<36}{format_seconds(case['seconds']):>14}{per_second:>16}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"seed": args.seed, "quick": args.quick, "environment": environment(), "results": results}, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
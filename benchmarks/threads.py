@@ -0,0 +1,65 @@
+"""Throughput of one shared DiceRoller as the number of threads grows.
+
+    python benchmarks/threads.py [--rolls 200000] [--notation 4d6] [--bulk]
+
+Every thread rolls through the same DiceRoller with its own RNG stream.
+On a GIL build of CPython single-roll throughput stays roughly flat
+(no lock contention collapse); --bulk uses roll_many, where NumPy does
+the work outside the GIL, and free-threaded builds scale both modes.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diceroll import DiceRoller
+
+
+def run(num_threads, total_rolls, notation, bulk):
+    roller = DiceRoller(save_rolls=False, seed=1)
+    per_thread = total_rolls // num_threads
+    start = threading.Barrier(num_threads + 1)
+
+    def worker():
+        start.wait()
+        if bulk:
+            done = 0
+            while done < per_thread: # Batches of 10000 plus a remainder, so every thread rolls per_thread
+                batch = min(10000, per_thread - done)
+                roller.roll_many(notation, batch)
+                done += batch
+        else:
+            for _ in range(per_thread):
+                roller.roll_dice(notation)
+
+    threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    return per_thread * num_threads / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rolls", type=int, default=200000)
+    parser.add_argument("--notation", default="4d6")
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--bulk", action="store_true", help="use roll_many batches of 10000")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    for num_threads in [int(n) for n in args.threads.split(",")]:
+        rate = run(num_threads, args.rolls, args.notation, args.bulk)
+        baseline = baseline or rate
+        print(f"{num_threads:>3} threads: {rate:>12,.0f} rolls/s  x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,138 @@
-import random
-import re
-from collections import defaultdict
+import threading
+import time
+from collections import defaultdict, deque
+from diceroll_notation import compile_notation
+from diceroll_rng import RandomStreams
+
+# Importing diceroll only pulls in the core roller. Probability, bulk/NumPy,
+# history, statistics and animation modules load on first use, either inside
+# the methods below or through the lazy names in _LAZY_NAMES.
+_LAZY_NAMES = {
+    "Distribution": "diceroll_prob",
+    "get_distribution": "diceroll_prob",
+    "configure_distribution_cache": "diceroll_prob",
+    "RollStats": "diceroll_stats",
+    "RollStore": "diceroll_store",
+    "HistorySink": "diceroll_history",
+    "BackgroundHistorySink": "diceroll_history",
+    "HistorySinkClosed": "diceroll_history",
+    "simulate": "diceroll_sim",
+    "DiceAnimator": "diceroll_anim",
+    "OutcomeDeterminer": "diceroll_outcome",
+    "OutcomeRules": "diceroll_outcome",
+    "Metrics": "diceroll_metrics",
+    "profile": "diceroll_metrics",
+}
+
+
+# Bulk batches at least this big draw totals from an alias table; smaller ones
+# would spend more on building the table than they save
+ALIAS_MIN_ROLLS = 1000
+
+
+def _alias_cache():
+    """The shared alias-table cache for totals_only rolls and bulk totals (imports the probability engine on first use)."""
+    from diceroll_alias import alias_cache
+    return alias_cache
+
+
+def __getattr__(name):
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'diceroll' has no attribute '{name}'")
+    import importlib
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_NAMES))
 
-# Fixed syntax error (was print|)
-print("++ diceroll init")
 
 class DiceRoller:
-    def __init__(self, save_rolls=False):
+    def __init__(self, save_rolls=False, history_size=10000, history_sink=None, seed=None, track_stats=False, rng="python",
+                 outcome_determiner=None, metrics=None):
         self.last_roll_total = None
         self.last_roll_details = None
-        self.last_5_rolls = []
+        self.last_5_rolls = deque(maxlen=5)
         self.save_rolls = save_rolls
-        self.roll_history = []
-
-    def roll_dice(self, dice_notation, target=None, success_outcome=None, failure_outcome=None):
-        roll_results = []
-        roll_sum = 0
-
-        # Fixed parsing logic (Bug 1)
-        matches = re.findall(r"(\d+)d(\d+)", dice_notation)
-
-        if not matches and dice_notation.strip():
-            raise ValueError(f"Invalid dice notation: {dice_notation}. Expected format like '1d6' or '2d8+1d4'.")
-
-        for match in matches:
-            number_of_dice, dice_size = int(match[0]), int(match[1])
-            component_results = [random.randint(1, dice_size) for _ in range(number_of_dice)]
-            roll_results.extend(component_results)
-            roll_sum += sum(component_results)
+        self.history_size = history_size
+        self.roll_history = deque(maxlen=history_size) # Ring buffer, oldest rolls drop off
+        self.history_sink = history_sink # Shared per log file and created on first saved roll if not given
+        self._shared_sink = False
+        self.random_streams = RandomStreams(seed, rng) # One RNG stream per thread; rng picks the backend
+        self.track_stats = track_stats
+        self.live_stats = {} # dice_notation -> RollStats over rolls made through roll_dice
+        self.outcome_determiner = outcome_determiner # Replaces the built-in total >= target check
+        self.metrics = metrics # diceroll_metrics.Metrics; None keeps roll_dice untimed
+        # Guards last_*, roll_history and the sink so concurrent rolls record atomically
+        self._lock = threading.RLock()
+
+    def roll_dice(self, dice_notation, target=None, success_outcome=None, failure_outcome=None, totals_only=False):
+        if self.metrics is not None:
+            return self._roll_dice_timed(dice_notation, target, success_outcome, failure_outcome, totals_only)
+        # Parsed once per notation and shared via the LRU in diceroll_notation
+        program = compile_notation(dice_notation)
+        roll_data = self._sample(program, dice_notation, target, totals_only)
+        self._apply_target(roll_data, target, success_outcome, failure_outcome)
+        self._record(roll_data)
+        return roll_data
 
-        if not roll_results and not matches:
-             raise ValueError(f"No dice found to roll in: {dice_notation}")
+    def _roll_dice_timed(self, dice_notation, target, success_outcome, failure_outcome, totals_only):
+        """roll_dice with each stage timed into self.metrics."""
+        metrics = self.metrics
+        clock = time.perf_counter
+        began = clock()
+        try:
+            program = compile_notation(dice_notation)
+        except ValueError:
+            metrics.count("errors")
+            raise
+        parsed = clock()
+        roll_data = self._sample(program, dice_notation, target, totals_only)
+        sampled = clock()
+        self._apply_target(roll_data, target, success_outcome, failure_outcome)
+        decided = clock()
+        self._record(roll_data)
+        metrics.record_roll(program.num_dice, parsed - began, sampled - parsed, decided - sampled, clock() - decided)
+        return roll_data
 
-        roll_data = {
+    def _sample(self, program, dice_notation, target, totals_only):
+        """Rolls a compiled notation into a new roll dict (no target, not recorded)."""
+        table = _alias_cache().get(program) if totals_only and not self._needs_faces(target) else None
+        if table is not None:
+            # One draw from the cached exact distribution; no per-die values
+            roll_sum, roll_results = table.draw(self.random_streams.python().random), []
+        else:
+            roll_sum, roll_results = program.roll(self.random_streams.randint())
+        return {
             "dice_notation": dice_notation,
             "roll_result": roll_sum,
             "roll_details": roll_results
         }
 
+    def enable_metrics(self, metrics=None):
+        """Starts timing roll_dice stages; returns the Metrics collecting them."""
+        if metrics is None:
+            from diceroll_metrics import Metrics
+            metrics = Metrics()
+        self.metrics = metrics
+        return metrics
+
+    def disable_metrics(self):
+        self.metrics = None
+
+    def _needs_faces(self, target):
+        # Natural-roll rules read the die face, which an alias-table draw does not have
+        return target is not None and bool(getattr(self.outcome_determiner, "natural", None))
+
+    def _apply_target(self, roll_data, target, success_outcome, failure_outcome):
+        roll_sum = roll_data["roll_result"]
         # Fixed target handling to be more flexible
-        if target is not None:
+        if target is not None and self.outcome_determiner is not None:
+            self._apply_determiner(roll_data, target, success_outcome, failure_outcome)
+        elif target is not None:
             is_success = roll_sum >= target
             roll_data["target"] = target
             roll_data["success"] = is_success
@@ -49,6 +142,8 @@ class DiceRoller:
                     outcome = success_outcome
                 else:
                     outcome = failure_outcome
+                # Copy so outcome templates can be shared between rolls and threads
+                outcome = dict(outcome)
                 outcome["roll_result"] = roll_sum
                 roll_data["outcome"] = outcome
             # Add simple text outcome if full dicts aren't provided
@@ -57,17 +152,48 @@ class DiceRoller:
             else:
                  roll_data["outcome_text"] = "Failure"
 
+    def _apply_determiner(self, roll_data, target, success_outcome, failure_outcome):
+        from diceroll_outcome import OutcomeRules
+        determiner = self.outcome_determiner
+        outcome = determiner.determine_outcome(roll_data, target, success_outcome, failure_outcome)
+        roll_data["target"] = target
+        if isinstance(determiner, OutcomeRules):
+            roll_data.update(outcome)
+            roll_data["outcome_text"] = outcome["tier"]
+        elif isinstance(outcome, dict):
+            # Custom determiners pick an outcome dict; copy it like the built-in path does
+            outcome = dict(outcome)
+            outcome["roll_result"] = roll_data["roll_result"]
+            roll_data["outcome"] = outcome
+            roll_data["success"] = outcome.get("success", roll_data["roll_result"] >= target)
+        else:
+            # No outcome dicts (e.g. a plain OutcomeDeterminer()): fall back to the built-in fields
+            is_success = roll_data["roll_result"] >= target
+            roll_data["success"] = is_success
+            if outcome is not None:
+                roll_data["outcome_text"] = str(outcome)
+            else:
+                roll_data["outcome_text"] = "Success" if is_success else "Failure"
 
-        self.last_5_rolls.append(roll_data)
-        self.last_5_rolls = self.last_5_rolls[-5:]
+    def _record(self, roll_data):
+        with self._lock:
+            if self.save_rolls:
+                # First, so a sink that rejects the roll leaves the roller unchanged.
+                # Disk I/O happens on the sink's writer thread, not here
+                self.get_history_sink().write(roll_data)
+                self.roll_history.append(roll_data)
 
-        if self.save_rolls:
-            self.roll_history.append(roll_data)
-            self.save_last_5_rolls()
+            self.last_5_rolls.append(roll_data)
 
-        self.last_roll_total = roll_sum
-        self.last_roll_details = roll_results
-        return roll_data
+            self.last_roll_total = roll_data["roll_result"]
+            self.last_roll_details = roll_data["roll_details"]
+
+            if self.track_stats:
+                from diceroll_stats import RollStats
+                stats = self.live_stats.get(roll_data["dice_notation"])
+                if stats is None:
+                    stats = self.live_stats[roll_data["dice_notation"]] = RollStats()
+                stats.add(roll_data["roll_result"])
 
     def get_last_roll_total(self):
         return self.last_roll_total
@@ -75,39 +201,123 @@ class DiceRoller:
     def get_last_roll_details(self):
         return self.last_roll_details
 
+    def get_last_roll(self):
+        """Returns (total, details) of the last roll as a consistent pair."""
+        with self._lock:
+            return self.last_roll_total, self.last_roll_details
+
     def get_last_5_rolls(self):
-        return self.last_5_rolls
+        with self._lock:
+            return list(self.last_5_rolls)
 
     def get_roll_history(self):
-        return self.roll_history
+        with self._lock:
+            return list(self.roll_history)
 
     def set_roll_history(self, roll_history):
-        self.roll_history = roll_history
+        # Slice first so a large lazy RollStore only builds the rows that are kept
+        if self.history_size is not None:
+            roll_history = roll_history[-self.history_size:]
+        roll_history = deque(roll_history, maxlen=self.history_size)
+        with self._lock:
+            self.roll_history = roll_history
+
+    def get_history_sink(self):
+        with self._lock:
+            if self.history_sink is None:
+                from diceroll_history import get_history_sink
+                self.history_sink = get_history_sink()
+                self._shared_sink = True
+            return self.history_sink
+
+    def flush_history(self):
+        if self.history_sink is not None:
+            return self.history_sink.flush()
+
+    def close(self):
+        """Flushes the history sink, and stops it unless it is the shared one other rollers may use."""
+        if self.history_sink is None:
+            return
+        if self._shared_sink:
+            self.history_sink.flush()
+        else:
+            self.history_sink.close()
 
     def save_last_5_rolls(self):
-        with open("last_5_rolls.txt", "w") as file:
-            for i, roll_data in enumerate(self.last_5_rolls, 1):
-                file.write(f"Result {i}:\n")
-                file.write(f"  Dice Notation: {roll_data['dice_notation']}\n")
-                file.write(f"  Roll Result: {roll_data['roll_result']}\n")
-                file.write(f"  Roll Details: {roll_data['roll_details']}\n")
-                file.write("\n")
-
-    def get_roll_statistics(self, dice_notation, num_rolls):
-        roll_results = []
-        for _ in range(num_rolls):
-            roll_data = self.roll_dice(dice_notation)
-            roll_results.append(roll_data["roll_result"])
-
-        statistics = {
+        from diceroll_history import write_last_rolls
+        if self.metrics is None:
+            write_last_rolls("last_5_rolls.txt", self.last_5_rolls)
+            return
+        with self.metrics.timed("save_last_5_rolls"):
+            write_last_rolls("last_5_rolls.txt", self.last_5_rolls)
+
+    def roll_many(self, dice_notation, num_rolls, details=False, seed=None):
+        """Rolls a notation num_rolls times in one batch, without history or roll dicts.
+
+        Returns a dict with 'totals' (NumPy array, or list without NumPy) and,
+        if details is True, 'roll_details' with one row of die values per roll.
+        """
+        from diceroll_bulk import make_rng, roll_many
+        program = compile_notation(dice_notation)
+        rng = make_rng(seed) if seed is not None else self.random_streams.bulk()
+        table = None
+        if not details and num_rolls >= ALIAS_MIN_ROLLS and sum(count for count, _ in program.groups) > 1:
+            table = _alias_cache().get(program)
+        if table is not None:
+            # O(1) per roll whatever the dice count, and keep/drop rules cost nothing extra
+            totals, roll_details = table.sample(rng, num_rolls), None
+        else:
+            totals, roll_details = roll_many(program, num_rolls, details, rng)
+        batch = {
             "dice_notation": dice_notation,
             "num_rolls": num_rolls,
-            "average": sum(roll_results) / num_rolls if num_rolls > 0 else 0, # Avoid division by zero
-            "min": min(roll_results) if roll_results else 0,
-            "max": max(roll_results) if roll_results else 0,
-            "frequency": self.calculate_frequency(roll_results)
+            "totals": totals
         }
-        return statistics
+        if details:
+            batch["roll_details"] = roll_details
+        return batch
+
+    def roll_dice_batch(self, dice_notation, targets):
+        """One roll of dice_notation per entry of targets (None for no target), drawn as one batch.
+
+        Returns the same roll dicts as roll_dice, in order, and records
+        them in the history like individual rolls.
+        """
+        from diceroll_bulk import roll_many
+        program = compile_notation(dice_notation)
+        totals, roll_details = roll_many(program, len(targets), True, self.random_streams.bulk())
+        if hasattr(totals, "tolist"):
+            totals = totals.tolist()
+        if hasattr(roll_details, "tolist"):
+            roll_details = roll_details.tolist()
+        rolls = []
+        for total, details, target in zip(totals, roll_details, targets):
+            roll_data = {
+                "dice_notation": dice_notation,
+                "roll_result": total,
+                "roll_details": details
+            }
+            self._apply_target(roll_data, target, None, None)
+            self._record(roll_data)
+            rolls.append(roll_data)
+        return rolls
+
+    def get_roll_statistics(self, dice_notation, num_rolls, seed=None, workers=None, ci_width=None):
+        if workers is not None or ci_width is not None:
+            # Sharded across processes, optionally stopping once the mean is known to ci_width
+            from diceroll_sim import simulate
+            return simulate(dice_notation, num_rolls, workers=workers, seed=seed, ci_width=ci_width)
+        from diceroll_bulk import histogram
+        from diceroll_stats import RollStats
+        totals = self.roll_many(dice_notation, num_rolls, seed=seed)["totals"]
+        return RollStats().add_counts(histogram(totals)).as_statistics(dice_notation)
+
+    def get_live_statistics(self, dice_notation):
+        """Statistics over the rolls of dice_notation made so far (needs track_stats=True)."""
+        from diceroll_stats import RollStats
+        with self._lock:
+            stats = self.live_stats.get(dice_notation) or RollStats()
+            return stats.as_statistics(dice_notation)
 
     def calculate_frequency(self, roll_results):
         frequency = defaultdict(int)
@@ -115,55 +325,127 @@ class DiceRoller:
             frequency[result] += 1
         return dict(frequency)
 
-    # Fixed: Removed unused parameters (Bug 2)
-    def roll_with_advantage(self, dice_notation):
-        roll_data_1 = self.roll_dice(dice_notation)
-        roll_data_2 = self.roll_dice(dice_notation)
-        if roll_data_1["roll_result"] >= roll_data_2["roll_result"]:
-            return roll_data_1
+    def check_targets(self, dice_notation, targets, probabilities=False, exact=False, seed=None):
+        """Rolls the notation once per target in one batch and checks total >= target.
+
+        Returns 'totals' and 'success' arrays (NumPy when available, else
+        lists) aligned with targets, plus exact per-target 'probabilities'
+        if requested. Nothing is recorded in the roll history.
+        """
+        from diceroll_bulk import make_rng, check_targets
+        program = compile_notation(dice_notation)
+        rng = make_rng(seed) if seed is not None else self.random_streams.bulk()
+        totals, success = check_targets(program, targets, rng)
+        batch = {
+            "dice_notation": dice_notation,
+            "targets": targets,
+            "totals": totals,
+            "success": success
+        }
+        if probabilities:
+            from diceroll_prob import get_distribution
+            dist = get_distribution(dice_notation)
+            by_target = {target: dist.at_least(target, exact) for target in set(targets)}
+            batch["probabilities"] = [by_target[target] for target in targets]
+        return batch
+
+    def roll_outcomes(self, dice_notation, num_rolls, rules=None, target=None, probabilities=False, exact=False, seed=None):
+        """Rolls num_rolls times in one batch and sorts the totals into outcome tiers.
+
+        rules is an OutcomeRules (default: this roller's outcome_determiner).
+        Returns 'totals', 'tiers' (tier index per roll, NumPy when
+        available), 'tier_names', per-tier 'counts' and, if requested, the
+        exact per-tier 'probabilities'. Nothing is recorded in the history.
+        """
+        from diceroll_bulk import make_rng, roll_many
+        from diceroll_outcome import OutcomeRules
+        rules = rules or self.outcome_determiner
+        if not isinstance(rules, OutcomeRules):
+            raise ValueError("roll_outcomes needs OutcomeRules; custom determiners run per roll through roll_dice")
+        program = compile_notation(dice_notation)
+        rng = make_rng(seed) if seed is not None else self.random_streams.bulk()
+        naturals = None
+        if rules.natural and rules.natural_term(program) is not None:
+            totals, roll_details = roll_many(program, num_rolls, True, rng)
+            naturals = roll_details[:, 0] if hasattr(roll_details, "shape") else [row[0] for row in roll_details]
         else:
-            return roll_data_2
+            totals, _ = roll_many(program, num_rolls, rng=rng)
+        tiers = rules.classify_many(totals, target, naturals)
+        batch = {
+            "dice_notation": dice_notation,
+            "num_rolls": num_rolls,
+            "totals": totals,
+            "tiers": tiers,
+            "tier_names": rules.names,
+            "counts": rules.count_tiers(tiers)
+        }
+        if probabilities:
+            batch["probabilities"] = rules.tier_probabilities(dice_notation, target, exact)
+        return batch
+
+    def get_outcome_probabilities(self, dice_notation, rules=None, target=None, exact=False):
+        """Exact chance of each outcome tier for one roll."""
+        return (rules or self.outcome_determiner).tier_probabilities(dice_notation, target, exact)
 
     # Fixed: Removed unused parameters (Bug 2)
-    def roll_with_disadvantage(self, dice_notation):
-        roll_data_1 = self.roll_dice(dice_notation)
-        roll_data_2 = self.roll_dice(dice_notation)
-        if roll_data_1["roll_result"] <= roll_data_2["roll_result"]:
-            return roll_data_1
-        else:
-            return roll_data_2
+    def roll_with_advantage(self, dice_notation, target=None):
+        return self.roll_best_of(dice_notation, 2, highest=True, target=target)
 
-    def get_dice_probabilities(self, dice_notation):
-        match = re.match(r"(\d+)d(\d+)", dice_notation)
-        if not match:
-            # Handle mixed notation better or clarify limitation
-            raise ValueError(f"Probability calculation currently only supports simple 'XdY' notation: {dice_notation}")
+    # Fixed: Removed unused parameters (Bug 2)
+    def roll_with_disadvantage(self, dice_notation, target=None):
+        return self.roll_best_of(dice_notation, 2, highest=False, target=target)
+
+    def roll_best_of(self, dice_notation, repeats, highest=True, target=None):
+        """Rolls the notation `repeats` times and keeps the best (or worst) as one recorded roll.
+
+        The totals of every repeat are listed under 'rolls'; ties keep the earliest roll.
+        """
+        if repeats < 1:
+            raise ValueError(f"repeats must be at least 1, got {repeats}")
+        program = compile_notation(dice_notation)
+        randint = self.random_streams.randint()
+        rolls = [program.roll(randint) for _ in range(repeats)]
+        totals = [roll_sum for roll_sum, _ in rolls]
+        pick = max(totals) if highest else min(totals)
+        roll_sum, roll_results = rolls[totals.index(pick)]
+        roll_data = {
+            "dice_notation": dice_notation,
+            "roll_result": roll_sum,
+            "roll_details": roll_results,
+            "rolls": totals
+        }
+        self._apply_target(roll_data, target, None, None)
+        self._record(roll_data)
+        return roll_data
+
+    def roll_many_best_of(self, dice_notation, repeats, num_rolls, highest=True, seed=None):
+        """Totals of num_rolls best-of (or worst-of) rolls, all repeats drawn in one batch."""
+        from diceroll_bulk import make_rng, roll_best_of
+        rng = make_rng(seed) if seed is not None else self.random_streams.bulk()
+        return roll_best_of(compile_notation(dice_notation), repeats, num_rolls, highest, rng)
+
+    def get_best_of_distribution(self, dice_notation, repeats=2, highest=True, exact=False):
+        """Exact values/PMF/CDF/survival for the best (or worst) of `repeats` rolls."""
+        from diceroll_prob import get_best_of_distribution
+        return get_best_of_distribution(dice_notation, repeats, highest).tables(exact)
 
-        number_of_dice, dice_size = int(match.group(1)), int(match.group(2))
+    def get_success_probability(self, dice_notation, target, repeats=1, highest=True, exact=False):
+        """Exact chance that the (best/worst of `repeats`) total is at least target."""
+        from diceroll_prob import get_best_of_distribution
+        return get_best_of_distribution(dice_notation, repeats, highest).at_least(target, exact)
 
-        probabilities = {}
-        for i in range(number_of_dice, number_of_dice * dice_size + 1):
-            probability = self.calculate_probability(i, number_of_dice, dice_size)
-            probabilities[i] = probability
+    def get_dice_probabilities(self, dice_notation):
+        # Whole PMF in one pass; mixed notation like '3d8+1d4' is supported
+        from diceroll_prob import get_distribution
+        return get_distribution(dice_notation).as_dict()
 
-        return probabilities
+    def get_dice_distribution(self, dice_notation, exact=False):
+        """Returns values, PMF, CDF and survival (P(total >= value)) lists."""
+        from diceroll_prob import get_distribution
+        return get_distribution(dice_notation).tables(exact)
 
     def calculate_probability(self, target_sum, number_of_dice, dice_size):
         if target_sum < number_of_dice or target_sum > number_of_dice * dice_size:
             return 0
-
-        # Using dynamic programming to calculate probabilities
-        dp = [[0] * (target_sum + 1) for _ in range(number_of_dice + 1)]
-        dp[0][0] = 1
-
-        for i in range(1, number_of_dice + 1):
-            for j in range(1, target_sum + 1):
-                for k in range(1, dice_size + 1):
-                    if j - k >= 0:
-                        dp[i][j] += dp[i - 1][j - k]
-
-        total_combinations = dice_size ** number_of_dice
-        favorable_combinations = dp[number_of_dice][target_sum]
-        probability = favorable_combinations / total_combinations
-
-        return probability
\ No newline at end of file
+        from diceroll_prob import dice_distribution
+        return dice_distribution(number_of_dice, dice_size).probability(target_sum)
\ No newline at end of file
@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+from diceroll_bulk import CHUNK_ROWS
+import diceroll_prob
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_TABLE_SPAN = 1 << 16 # Wider notations are rolled die by die instead
+
+
+class AliasTable:
+    """Walker/Vose alias table over a Distribution: draws a total in O(1), whatever the dice count."""
+    __slots__ = ("min_total", "size", "prob", "alias", "_np_prob", "_np_alias")
+
+    def __init__(self, dist):
+        counts = dist.counts
+        n = len(counts)
+        self.min_total = dist.min_total
+        self.size = n
+        prob = [0.0] * n
+        alias = list(range(n))
+        # Scaled so the average column holds exactly 1.0
+        scaled = [count * n / dist.total for count in counts]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large[-1]
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                large.pop()
+                small.append(l)
+        for i in large + small: # Leftovers are 1.0 up to rounding
+            prob[i] = 1.0
+        self.prob = prob
+        self.alias = alias
+        self._np_prob = None
+        self._np_alias = None
+
+    def draw(self, random):
+        """One total, using one call of a random() -> [0, 1) function."""
+        u = random() * self.size
+        i = int(u)
+        if u - i >= self.prob[i]:
+            i = self.alias[i]
+        return self.min_total + i
+
+    def sample(self, rng, num_rolls):
+        """num_rolls totals from a NumPy Generator (array) or random.Random (list)."""
+        if np is not None and isinstance(rng, np.random.Generator):
+            if self._np_prob is None:
+                self._np_prob = np.asarray(self.prob)
+                self._np_alias = np.asarray(self.alias, dtype=np.int64)
+            totals = np.empty(num_rolls, dtype=np.int64)
+            for start in range(0, num_rolls, CHUNK_ROWS): # Chunked, so temporaries stay small
+                n = min(CHUNK_ROWS, num_rolls - start)
+                columns = rng.integers(0, self.size, size=n)
+                keep = rng.random(n) < self._np_prob[columns]
+                totals[start:start + n] = np.where(keep, columns, self._np_alias[columns])
+            totals += self.min_total
+            return totals
+        draw = self.draw
+        random = rng.random
+        return [draw(random) for _ in range(num_rolls)]
+
+    def nbytes(self):
+        return self.size * 16
+
+
+class AliasCache:
+    """Bounded LRU of alias tables keyed by canonical notation."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, program):
+        """The table for a compiled notation, or None if it has no usable exact
+        distribution (exploding dice, or wider than MAX_TABLE_SPAN). Both are cached."""
+        key = program.canonical
+        with self._lock:
+            if key in self._tables:
+                self.hits += 1
+                self._tables.move_to_end(key)
+                return self._tables[key]
+            self.misses += 1
+        table = None
+        if sum(term.count * term.sides for term in program.dice_terms) <= MAX_TABLE_SPAN:
+            try:
+                # Looked up per call: configure_distribution_cache() replaces the module's cache
+                table = AliasTable(diceroll_prob.distribution_cache.get(program))
+            except ValueError:
+                pass # No exact distribution, e.g. exploding dice
+        with self._lock:
+            self._tables[key] = table
+            while len(self._tables) > self.maxsize:
+                self._tables.popitem(last=False)
+        return table
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._tables) > self.maxsize:
+                self._tables.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._tables),
+        }
+
+
+alias_cache = AliasCache()
@@ -1,10 +1,11 @@
 import random
-import pygame
 import time
 import os
-import re
-from datetime import datetime
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # No banner on import
+import pygame
 from diceroll import DiceRoller
+from diceroll_assets import get_assets, special_day_color, D6_COLORS, BASE_SIZES
+from diceroll_notation import compile_notation
 
 # Define DiceColor
 class DiceColor:
@@ -19,12 +20,104 @@ class AnimationStyle:
     TUMBLE = 'tumble'
     SPIN = 'spin'
 
+# --- Render cache: atlas, pre-rotated frames and glyphs ---
+class RenderCache:
+    """Keeps everything a frame needs pre-rendered, so drawing a die is just a blit.
+
+    Processed die images are packed into one atlas surface and handed out
+    as subsurfaces. Rotated frames are cached per image name at angles
+    quantized to rotation_steps per turn (or per whole degree for small
+    exact angles), and rendered number glyphs are cached per
+    (font, text, color).
+    """
+    def __init__(self, rotation_steps=36, atlas_width=1024):
+        self.rotation_steps = rotation_steps
+        self.atlas_width = atlas_width
+        self.atlas = None
+        self.names = {} # atlas subsurface -> image name
+        self.rotations = {} # (image name, degrees) -> rotated surface
+        self.glyphs = {} # (font, text, color) -> rendered surface
+
+    def build_atlas(self, images, names=None):
+        """Packs surfaces into one atlas (simple shelf packing). Returns subsurfaces in the same order.
+
+        names gives each image a stable key for the rotation cache, so its
+        rotated frames survive a rebuild (e.g. when a new color is added).
+        """
+        if not images: return []
+        placements = []
+        x = y = shelf_height = 0
+        width = 0
+        for img in images:
+            w, h = img.get_size()
+            if x + w > self.atlas_width and x > 0:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            placements.append((x, y, w, h))
+            x += w
+            width = max(width, x)
+            shelf_height = max(shelf_height, h)
+        self.atlas = pygame.Surface((width, y + shelf_height), pygame.SRCALPHA).convert_alpha()
+        self.atlas.fill((0, 0, 0, 0))
+        subsurfaces = []
+        for img, (x, y, w, h) in zip(images, placements):
+            self.atlas.blit(img, (x, y))
+            subsurfaces.append(self.atlas.subsurface(pygame.Rect(x, y, w, h)))
+        if names is None:
+            names = subsurfaces
+        self.names = dict(zip(subsurfaces, names))
+        # Drop the frames of images that are no longer packed; the rest are still valid
+        live = set(names)
+        self.rotations = {key: frame for key, frame in self.rotations.items() if key[0] in live}
+        return subsurfaces
+
+    def rotated(self, image, angle, exact=False):
+        """image rotated by angle, from the cache.
+
+        Angles snap to rotation_steps per turn. exact=True snaps to whole
+        degrees instead, for small wobbles that coarse steps would distort.
+        """
+        if exact:
+            degrees = int(round(angle)) % 360
+        else:
+            step = int(round(angle * self.rotation_steps / 360.0)) % self.rotation_steps
+            degrees = step * 360.0 / self.rotation_steps
+        key = (self.names.get(image, image), degrees)
+        frame = self.rotations.get(key)
+        if frame is None:
+            frame = pygame.transform.rotate(image, degrees)
+            self.rotations[key] = frame
+        return frame
+
+    def prerotate(self, images):
+        """Renders every rotation step of each image not done yet, ahead of the first animation."""
+        for img in images:
+            for step in range(self.rotation_steps):
+                self.rotated(img, step * 360.0 / self.rotation_steps)
+
+    def glyph(self, font, text, color):
+        key = (font, text, color)
+        surface = self.glyphs.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.glyphs[key] = surface
+        return surface
+
+    def clear(self):
+        self.atlas = None
+        self.names = {}
+        self.rotations.clear()
+        self.glyphs.clear()
+
+
 # --- Die Class (Physics Removed) ---
 class DieSprite:
-    def __init__(self, x, y, die_size, images_to_use, font, target_size=(60, 60)):
+    def __init__(self, x, y, die_size, images_to_use, font, target_size=(60, 60), render_cache=None, rng=random):
         self.x = x # Original center X
         self.y = y # Original center Y
-        self.rot = random.randint(0, 359)
+        self.rng = rng # Jitter source; a seeded random.Random gives repeatable frames
+        self.rot = rng.randint(0, 359)
         self.offset_x = 0 # Offset for shaking
         self.offset_y = 0 # Offset for shaking
         self.die_size = die_size
@@ -33,41 +126,48 @@ class DieSprite:
         self.final_value = 0
         self.is_d6 = (self.die_size == 6 and isinstance(self.images, list) and len(self.images) == 6)
         self.target_size = target_size
+        self.render_cache = render_cache
 
-        self.current_image_base = random.choice(self.images) if self.is_d6 else self.images[0]
+        self.current_image_base = rng.choice(self.images) if self.is_d6 else self.images[0]
         self.final_image = None
 
     def update_animation(self, style, duration_ratio):
         """Updates position/rotation - Reverted to simpler styles."""
         if not self.images: return
 
-        base_img = random.choice(self.images) if self.is_d6 else self.images[0]
+        rng = self.rng
+        base_img = rng.choice(self.images) if self.is_d6 else self.images[0]
         self.current_image_base = base_img
 
         if style == AnimationStyle.SHAKE:
-            self.rot = random.randint(-15, 15)
-            self.offset_x = random.randint(-10, 10)
-            self.offset_y = random.randint(-10, 10)
+            self.rot = rng.randint(-15, 15)
+            self.offset_x = rng.randint(-10, 10)
+            self.offset_y = rng.randint(-10, 10)
         elif style == AnimationStyle.TUMBLE:
-            self.rot = duration_ratio * 360 * random.uniform(0.8, 1.2) # Desync spin
+            self.rot = duration_ratio * 360 * rng.uniform(0.8, 1.2) # Desync spin
             self.offset_x = 0
             self.offset_y = 0
         elif style == AnimationStyle.SPIN:
-            self.rot = duration_ratio * 720 * random.uniform(0.8, 1.2) # Desync spin
+            self.rot = duration_ratio * 720 * rng.uniform(0.8, 1.2) # Desync spin
             self.offset_x = 0
             self.offset_y = 0
         else: # Default to SHAKE
-            self.rot = random.randint(-15, 15)
-            self.offset_x = random.randint(-10, 10)
-            self.offset_y = random.randint(-10, 10)
+            self.rot = rng.randint(-15, 15)
+            self.offset_x = rng.randint(-10, 10)
+            self.offset_y = rng.randint(-10, 10)
 
     def draw_animated(self, window):
         """Draws the die during animation using offsets."""
         if not self.current_image_base: return
-        rotated_image = pygame.transform.rotate(self.current_image_base, self.rot)
+        if self.render_cache is not None:
+            # SHAKE wobbles by at most 15 degrees; whole-degree frames keep it smooth
+            exact = -15 <= self.rot <= 15
+            rotated_image = self.render_cache.rotated(self.current_image_base, self.rot, exact)
+        else:
+            rotated_image = pygame.transform.rotate(self.current_image_base, self.rot)
         # Draw using base x/y + current offsets
         rect = rotated_image.get_rect(center=(int(self.x + self.offset_x), int(self.y + self.offset_y)))
-        window.blit(rotated_image, rect)
+        return window.blit(rotated_image, rect) # Area touched, for dirty-rect updates
 
     def set_final_value(self, value):
         """Sets the final value and prepares final image."""
@@ -85,9 +185,13 @@ class DieSprite:
         rect = self.final_image.get_rect(center=(pos_x, pos_y))
         window.blit(self.final_image, rect)
         if not self.is_d6:
-            text_surface = self.font.render(str(self.final_value), True, (255, 255, 255))
+            if self.render_cache is not None:
+                text_surface = self.render_cache.glyph(self.font, str(self.final_value), (255, 255, 255))
+                shadow_surface = self.render_cache.glyph(self.font, str(self.final_value), (0, 0, 0))
+            else:
+                text_surface = self.font.render(str(self.final_value), True, (255, 255, 255))
+                shadow_surface = self.font.render(str(self.final_value), True, (0, 0, 0))
             text_rect = text_surface.get_rect(center=rect.center)
-            shadow_surface = self.font.render(str(self.final_value), True, (0, 0, 0))
             window.blit(shadow_surface, (text_rect.x + 1, text_rect.y + 1))
             window.blit(text_surface, text_rect)
 
@@ -95,18 +199,26 @@ class DieSprite:
 
 class DiceAnimator:
     def __init__(self, window_width=600, window_height=400, dice_image_path="diceroll/images"):
-        pygame.init()
         self.window_width = window_width
         self.window_height = window_height
         self.window = None
         self.dice_image_path = dice_image_path
-        self.raw_dice_sets = {}
-        self.raw_base_images = {}
+        self.assets = get_assets(dice_image_path) # Decoded images are shared by every animator
         self.processed_dice_sets = {}
         self.processed_base_images = {}
         self.images_loaded = False
         self.images_processed = False
+        self.render_cache = RenderCache()
+        self.dice_roller = None # Used by run_animation when no roller is passed in
+        self.pygame_ready = False
+        self.animation_speed = 1.0
+        self.frame_rate = 30 # Target frames per second; late frames are dropped
+        self.animation_style = AnimationStyle.SHAKE # Reverted Default!
 
+    def _init_pygame(self):
+        """Initializes pygame and fonts on first animation, not at construction."""
+        if self.pygame_ready: return
+        pygame.init()
         try:
             self.font = pygame.font.Font(None, 36)
             self.large_font = pygame.font.Font(None, 72)
@@ -118,67 +230,100 @@ class DiceAnimator:
             self.large_font = pygame.font.SysFont('Arial', 72)
             self.outcome_font = pygame.font.SysFont('Arial', 48)
             self.die_number_font = pygame.font.SysFont('Arial', 30, bold=True)
-
-        self.animation_speed = 1.0
-        self.animation_style = AnimationStyle.SHAKE # Reverted Default!
+        self.pygame_ready = True
 
     def _load_raw_images(self):
-        """Loads images WITHOUT converting or scaling."""
+        """Checks the shared asset manager has images; they are decoded lazily, already scaled."""
         if self.images_loaded: return True
-        print(f"--- Loading Raw Images from: {self.dice_image_path} ---")
-        today = datetime.today()
-        is_special_day = (today.month == 10 and today.day == 31) or (today.month == 4 and today.day == 1)
-        d6_colors = ['bread'] if is_special_day else [DiceColor.RED, DiceColor.WHITE, DiceColor.BLUE, DiceColor.BLACK]
-        base_sizes = [4, 8, 10, 12, 20]
-        for color in d6_colors:
-            dice_set = []
-            image_dir = os.path.join(self.dice_image_path, color)
-            if not os.path.isdir(image_dir): continue
-            for i in range(1, 7):
-                image_path = os.path.join(image_dir, f"dice{i}.jpg")
-                if os.path.exists(image_path):
-                    try: img = pygame.image.load(image_path); dice_set.append(img)
-                    except pygame.error as e: print(f" -> Error loading {image_path}: {e}")
-            if dice_set: self.raw_dice_sets[color] = dice_set
-        for size in base_sizes:
-            image_path = os.path.join(self.dice_image_path, f"blank_d{size}.png")
-            if os.path.exists(image_path):
-                try: img = pygame.image.load(image_path); self.raw_base_images[size] = img
-                except pygame.error as e: print(f" -> Error loading {image_path}: {e}")
-        self.images_loaded = (bool(self.raw_dice_sets) or bool(self.raw_base_images))
+        self.images_loaded = self.assets.has_images()
         if not self.images_loaded: print(f"ERROR: No raw images found in {self.dice_image_path}")
         return self.images_loaded
 
     def _process_images(self):
-        """Scales and converts images AFTER display is set."""
+        """Converts the base images AFTER display is set. D6 sets are converted per color on first use."""
         if self.images_processed or not self.images_loaded: return
-        print("--- Processing Images ---")
-        for color, img_list in self.raw_dice_sets.items():
-            self.processed_dice_sets[color] = [
-                pygame.transform.scale(img.convert_alpha(), (60, 60))
-                for img in img_list ]
-        for size, img in self.raw_base_images.items():
-            self.processed_base_images[size] = pygame.transform.scale(img.convert_alpha(), (70, 70))
+        for size in BASE_SIZES:
+            img = self.assets.base_image(size)
+            if img is not None:
+                self.processed_base_images[size] = img.convert_alpha()
+        self._rebuild_atlas()
         self.images_processed = True
-        print("--- Image Processing Finished ---")
 
-    def _display_text_only(self, roll_result, dice_and_target_text):
-        """Displays only the total result as text."""
-        self.window.fill((255, 255, 255))
+    def _d6_set(self, color):
+        """The converted D6 faces for a color, fetched from the asset manager on first use."""
+        if color not in self.processed_dice_sets:
+            faces = self.assets.dice_set(color) if color else None
+            if not faces: return None
+            self.processed_dice_sets[color] = [img.convert_alpha() for img in faces]
+            self._rebuild_atlas()
+        return self.processed_dice_sets[color]
+
+    def _rebuild_atlas(self):
+        # Swap the processed images for subsurfaces of one shared atlas
+        keys = [(color, i) for color, img_list in self.processed_dice_sets.items() for i in range(len(img_list))]
+        sizes = list(self.processed_base_images)
+        packed = self.render_cache.build_atlas(
+            [self.processed_dice_sets[color][i] for color, i in keys] + [self.processed_base_images[size] for size in sizes],
+            [("d6", color, i) for color, i in keys] + [("base", size) for size in sizes])
+        for (color, i), img in zip(keys, packed):
+            self.processed_dice_sets[color][i] = img
+        for size, img in zip(sizes, packed[len(keys):]):
+            self.processed_base_images[size] = img
+        # Rotation steps up front, so no frame pays for a rotate. Frames are kept
+        # per image name across rebuilds, so only a new color's faces are rendered
+        self.render_cache.prerotate(packed)
+
+    def _resolve_dice_color(self, dice_color):
+        """Applies the special-day override and falls back to a D6 set that was loaded."""
+        dice_color = special_day_color() or dice_color
+        if self._d6_set(dice_color) is None:
+            print(f"Warning: D6 set for '{dice_color}' not found, using blue.")
+            dice_color = DiceColor.BLUE
+            if self._d6_set(dice_color) is None:
+                dice_color = next((color for color in D6_COLORS if self._d6_set(color) is not None), None)
+                if dice_color is not None:
+                    print(f"Warning: Blue D6 set not found, using '{dice_color}'.")
+                else:
+                    print("Warning: No D6 sets processed at all.")
+        return dice_color
+
+    def _displayable_dice(self, dice_notation, dice_color, roll_result):
+        """The die sizes to draw, or None if some die has no image (text-only display)."""
+        # Reuses the parse already done (and cached) by roll_dice
+        all_dice_defs = list(compile_notation(dice_notation).dice_defs)
+        if not all_dice_defs or len(all_dice_defs) != len(roll_result['roll_details']):
+            return None
+        for size in all_dice_defs:
+            can_show_d6 = (size == 6 and dice_color and self.processed_dice_sets.get(dice_color))
+            can_show_base = (size != 6 and size in self.processed_base_images)
+            if not (can_show_d6 or can_show_base):
+                return None
+        return all_dice_defs
+
+    def _draw_text_only(self, surface, roll_result, dice_and_target_text):
+        """Draws only the total result as text."""
+        surface.fill((255, 255, 255))
         dice_and_target_render = self.font.render(dice_and_target_text, True, (0, 0, 0))
         dice_and_target_rect = dice_and_target_render.get_rect(midtop=(self.window_width // 2, 10))
-        self.window.blit(dice_and_target_render, dice_and_target_rect)
+        surface.blit(dice_and_target_render, dice_and_target_rect)
         result_text = self.large_font.render(f"{roll_result['roll_result']}", True, (0, 0, 0))
         result_rect = result_text.get_rect(center=(self.window_width // 2, self.window_height // 2))
-        self.window.blit(result_text, result_rect)
+        surface.blit(result_text, result_rect)
+        self._draw_outcome(surface, roll_result)
+
+    def _draw_outcome(self, surface, roll_result):
         if 'outcome_text' in roll_result:
             outcome_text_render = self.outcome_font.render(roll_result['outcome_text'], True, (0, 128, 0) if roll_result.get('success', False) else (255, 0, 0))
             outcome_rect = outcome_text_render.get_rect(midbottom=(self.window_width // 2, self.window_height - 10))
-            self.window.blit(outcome_text_render, outcome_rect)
+            surface.blit(outcome_text_render, outcome_rect)
+
+    def _display_text_only(self, roll_result, dice_and_target_text):
+        """Displays only the total result as text."""
+        self._draw_text_only(self.window, roll_result, dice_and_target_text)
         pygame.display.flip()
 
-    def _display_multiple_dice(self, roll_result, dice_color, dice_and_target_text, all_dice_defs):
-        """Handles animation and display for multiple dice (reverted style)."""
+    def _layout_dice(self, roll_result, dice_color, all_dice_defs, rng=random, center_y=None):
+        """Creates one DieSprite per die, placed at its final position."""
         dice_list = []
         d6_set_to_use = self.processed_dice_sets.get(dice_color)
         base_images_to_use = self.processed_base_images
@@ -191,42 +336,22 @@ class DiceAnimator:
             total_width = (num_dice * die_width) + ((num_dice - 1) * spacing)
             start_x_layout = (self.window_width - total_width) / 2 + (die_width / 2)
             x = start_x_layout + i * (die_width + spacing)
-            y = self.window_height / 2 - 40 # Use final Y
+            y = self.window_height / 2 - 40 if center_y is None else center_y # Use final Y
 
             images_for_this_die = d6_set_to_use if die_size == 6 else [base_images_to_use.get(die_size)]
             if not images_for_this_die or not images_for_this_die[0]: continue
             target_size = (60, 60) if die_size == 6 else (70, 70)
-            die = DieSprite(x, y, die_size, images_for_this_die, self.die_number_font, target_size)
+            die = DieSprite(x, y, die_size, images_for_this_die, self.die_number_font, target_size, self.render_cache, rng)
             die.set_final_value(roll_result['roll_details'][i])
             dice_list.append(die)
+        return dice_list
 
-        clock = pygame.time.Clock()
-        animation_duration = 1.0 / self.animation_speed # Shorter duration
-
-        dice_and_target_render = self.font.render(dice_and_target_text, True, (0, 0, 0))
-        dice_and_target_rect = dice_and_target_render.get_rect(midtop=(self.window_width // 2, 10))
-
-        start_time = time.time()
-        while time.time() - start_time < animation_duration:
-            duration_ratio = (time.time() - start_time) / animation_duration
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: pygame.quit(); return None
-
-            self.window.fill((255, 255, 255))
-            self.window.blit(dice_and_target_render, dice_and_target_rect)
-
-            for die in dice_list:
-                # Pass duration ratio for Tumble/Spin, but not window size
-                die.update_animation(self.animation_style, duration_ratio)
-                die.draw_animated(self.window)
-
-            pygame.display.flip()
-            clock.tick(30) # Back to 30fps is fine for this style
-
-        # --- Final Display ---
-        self.window.fill((255, 255, 255))
-        self.window.blit(dice_and_target_render, dice_and_target_rect)
+    def _draw_final(self, surface, roll_result, dice_list, title_render, title_rect):
+        """Draws the settled dice, the total and the outcome."""
+        surface.fill((255, 255, 255))
+        surface.blit(title_render, title_rect)
 
+        num_dice = len(dice_list)
         die_width = 70
         spacing = 20
         total_width = (num_dice * die_width) + ((num_dice - 1) * spacing)
@@ -235,21 +360,70 @@ class DiceAnimator:
         for i, die in enumerate(dice_list):
             pos_x = start_x + i * (die_width + spacing)
             # Use the die's original Y, which is the final Y now
-            die.draw_final(self.window, int(pos_x), int(die.y))
+            die.draw_final(surface, int(pos_x), int(die.y))
 
         total_text = self.large_font.render(f"Total: {roll_result['roll_result']}", True, (0, 0, 0))
         total_rect = total_text.get_rect(center=(self.window_width // 2, self.window_height / 2 + 60))
-        self.window.blit(total_text, total_rect)
+        surface.blit(total_text, total_rect)
+        self._draw_outcome(surface, roll_result)
 
-        if 'outcome_text' in roll_result:
-             outcome_text_render = self.outcome_font.render(roll_result['outcome_text'], True, (0, 128, 0) if roll_result.get('success', False) else (255, 0, 0))
-             outcome_rect = outcome_text_render.get_rect(midbottom=(self.window_width // 2, self.window_height - 10))
-             self.window.blit(outcome_text_render, outcome_rect)
+    def _title(self, dice_and_target_text):
+        dice_and_target_render = self.font.render(dice_and_target_text, True, (0, 0, 0))
+        return dice_and_target_render, dice_and_target_render.get_rect(midtop=(self.window_width // 2, 10))
 
+    def _display_multiple_dice(self, roll_result, dice_color, dice_and_target_text, all_dice_defs):
+        """Handles animation and display for multiple dice (reverted style)."""
+        dice_list = self._layout_dice(roll_result, dice_color, all_dice_defs)
+
+        animation_duration = 1.0 / self.animation_speed # Shorter duration
+        frame_interval = 1.0 / self.frame_rate
+
+        dice_and_target_render, dice_and_target_rect = self._title(dice_and_target_text)
+
+        # Paint the static background once; frames only repaint what the dice touch
+        self.window.fill((255, 255, 255))
+        self.window.blit(dice_and_target_render, dice_and_target_rect)
+        pygame.display.flip()
+
+        previous_rects = []
+        start_time = time.monotonic()
+        next_frame = start_time
+        while True:
+            now = time.monotonic()
+            if now - start_time >= animation_duration: break
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT: pygame.quit(); return None
+
+            # Drop frames we are already late for, so the animation keeps its duration
+            if now > next_frame + frame_interval:
+                next_frame += int((now - next_frame) / frame_interval) * frame_interval
+            duration_ratio = (now - start_time) / animation_duration
+
+            for rect in previous_rects:
+                self.window.fill((255, 255, 255), rect)
+                if rect.colliderect(dice_and_target_rect):
+                    self.window.blit(dice_and_target_render, dice_and_target_rect)
+            drawn_rects = []
+            for die in dice_list:
+                # Pass duration ratio for Tumble/Spin, but not window size
+                die.update_animation(self.animation_style, duration_ratio)
+                rect = die.draw_animated(self.window)
+                if rect: drawn_rects.append(rect)
+            pygame.display.update(previous_rects + drawn_rects)
+            previous_rects = drawn_rects
+
+            next_frame += frame_interval
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        # --- Final Display ---
+        self._draw_final(self.window, roll_result, dice_list, dice_and_target_render, dice_and_target_rect)
         pygame.display.flip()
 
     def animate_dice_roll(self, dice_notation, dice_color, dice_roller, target=None):
         """Main function to orchestrate the animation."""
+        self._init_pygame()
         if not self._load_raw_images():
             print("Cannot animate due to missing images.")
             return dice_roller.roll_dice(dice_notation, target=target)
@@ -258,56 +432,32 @@ class DiceAnimator:
         pygame.display.set_caption("Dice Roll")
         self._process_images()
 
-        today = datetime.today()
-        is_special_day = (today.month == 10 and today.day == 31) or (today.month == 4 and today.day == 1)
-        if is_special_day: dice_color = 'bread'
-        if dice_color not in self.processed_dice_sets:
-            print(f"Warning: D6 set for '{dice_color}' not found, using blue.")
-            dice_color = DiceColor.BLUE
-            if dice_color not in self.processed_dice_sets:
-                if self.processed_dice_sets:
-                    dice_color = list(self.processed_dice_sets.keys())[0]
-                    print(f"Warning: Blue D6 set not found, using '{dice_color}'.")
-                else:
-                    print("Warning: No D6 sets processed at all.")
-                    dice_color = None
+        dice_color = self._resolve_dice_color(dice_color)
 
         roll_result = dice_roller.roll_dice(dice_notation, target=target)
         if not roll_result: return None
 
         dice_and_target_text = f"{dice_notation}" + (f" (Target: {target})" if target else "")
 
-        matches = re.findall(r"(\d+)d(\d+)", dice_notation, re.IGNORECASE)
-        all_dice_defs = []
-        can_display_all = True
-        if not matches: can_display_all = False
-        else:
-            for num_str, size_str in matches:
-                num, size = int(num_str), int(size_str)
-                for _ in range(num):
-                    all_dice_defs.append(size)
-                    can_show_d6 = (size == 6 and dice_color and self.processed_dice_sets.get(dice_color))
-                    can_show_base = (size != 6 and size in self.processed_base_images)
-                    if not (can_show_d6 or can_show_base):
-                        can_display_all = False; break
-                if not can_display_all: break
-        if can_display_all and len(all_dice_defs) != len(roll_result['roll_details']):
-            can_display_all = False
-
-        if can_display_all:
+        all_dice_defs = self._displayable_dice(dice_notation, dice_color, roll_result)
+        if all_dice_defs:
             self._display_multiple_dice(roll_result, dice_color, dice_and_target_text, all_dice_defs)
         else:
             self._display_text_only(roll_result, dice_and_target_text)
 
-        waiting = True
-        while waiting:
-             for event in pygame.event.get():
-                 if event.type == pygame.QUIT: waiting = False
-                 if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN: waiting = False
+        # Sleep in event.wait() until the user dismisses the window (no busy polling)
+        while pygame.display.get_init():
+            event = pygame.event.wait()
+            if event.type in (pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN): break
         return roll_result
 
-    def run_animation(self, dice_notation, dice_color=DiceColor.BLUE, target=None, save_rolls=False):
-        dice_roller = DiceRoller(save_rolls=save_rolls)
+    def run_animation(self, dice_notation, dice_color=DiceColor.BLUE, target=None, save_rolls=False, dice_roller=None):
+        if dice_roller is None:
+            # One roller per animator, not one per call
+            if self.dice_roller is None:
+                self.dice_roller = DiceRoller()
+            dice_roller = self.dice_roller
+            dice_roller.save_rolls = save_rolls
         result = self.animate_dice_roll(dice_notation, dice_color, dice_roller, target)
         return result
 
@@ -317,6 +467,10 @@ class DiceAnimator:
 
     def set_dice_image_path(self, path):
         self.dice_image_path = path
+        self.assets = get_assets(path)
+        self.processed_dice_sets = {}
+        self.processed_base_images = {}
+        self.render_cache.clear()
         self.images_loaded = False
         self.images_processed = False
 
@@ -1,5 +1,5 @@
-import json
-import re # Added for DiceType handling
+import os
+import sys
 from diceroll import DiceRoller
 # REMOVED all imports related to DiceAnimator and datetime
 
@@ -25,27 +25,50 @@ class AnimationStyle: # Keep for reference if GUI needs it
 
 # --- API Class (No Animator) ---
 class dicerollAPI:
-    def __init__(self, save_rolls=False):
-        self.dice_roller = DiceRoller(save_rolls=save_rolls)
+    def __init__(self, save_rolls=False, history_size=10000, history_sink=None, seed=None, rng="python", log_console=None):
+        self.dice_roller = DiceRoller(save_rolls=save_rolls, history_size=history_size, history_sink=history_sink, seed=seed, rng=rng)
+        if log_console is None:
+            # On by default only when debug.txt sits next to the running script
+            script_dir = os.path.dirname(os.path.abspath(sys.argv[0])) if sys.argv and sys.argv[0] else os.getcwd()
+            log_console = os.path.exists(os.path.join(script_dir, "debug.txt"))
+        self.log_console = log_console
         # REMOVED self.dice_animator = DiceAnimator()
 
     # REMOVED set_animation_window_size
     # REMOVED set_dice_image_path
     # REMOVED set_animation_style
 
-    def roll_dice(self, dice_notation, target_value=None):
-        """Rolls dice based on notation, no animation."""
+    def roll_dice(self, dice_notation, target_value=None, totals_only=False):
+        """Rolls dice based on notation, no animation. totals_only skips per-die roll_details."""
         try:
-            roll_result = self.dice_roller.roll_dice(dice_notation, target=target_value)
-            return roll_result
+            roll_result = self.dice_roller.roll_dice(dice_notation, target=target_value, totals_only=totals_only)
         except ValueError as e:
-            print(f"Invalid dice notation: {dice_notation}. Error: {str(e)}")
+            self._invalid_notation(dice_notation, e, count_error=False)
+            return None
+        if self.log_console:
+            print(f"Rolled {dice_notation}: {roll_result['roll_result']} {roll_result['roll_details']}")
+        return roll_result
+
+    def _invalid_notation(self, dice_notation, error, count_error=True):
+        # roll_dice errors are already counted by the roller's timed path
+        metrics = self.dice_roller.metrics
+        if count_error and metrics is not None:
+            metrics.count("errors")
+        print(f"Invalid dice notation: {dice_notation}. Error: {str(error)}")
+
+    def roll_dice_batch(self, dice_notation, target_values):
+        """Rolls dice_notation once per target value (None for no target) in a single batch."""
+        try:
+            return self.dice_roller.roll_dice_batch(dice_notation, target_values)
+        except ValueError as e:
+            self._invalid_notation(dice_notation, e)
             return None
 
     def roll_single_dice(self, dice_type):
         return self.roll_dice(dice_type)
 
     def roll_multiple_dice_of_same_type(self, dice_type, num_dice):
+        import re # Only needed here, kept off the import path
         d_match = re.search(r"d(\d+)", dice_type)
         if not d_match:
             raise ValueError(f"Invalid dice_type format: {dice_type}")
@@ -64,27 +87,50 @@ class dicerollAPI:
         return roll_results
 
     def get_roll_sum(self, roll_result):
-        return sum(roll_result['roll_details']) if roll_result else 0
+        # roll_details holds unsigned faces without the flat modifier; the total already has both
+        return roll_result['roll_result'] if roll_result else 0
 
+    # Per-die helpers: None for a totals_only roll, which has no roll_details
     def get_roll_average(self, roll_result):
-        roll_details = roll_result['roll_details'] if roll_result else []
-        return sum(roll_details) / len(roll_details) if roll_details else 0
+        if not roll_result:
+            return 0
+        roll_details = roll_result['roll_details']
+        return sum(roll_details) / len(roll_details) if roll_details else None
 
     def get_roll_max(self, roll_result):
-        return max(roll_result['roll_details']) if roll_result and roll_result['roll_details'] else 0
+        if not roll_result:
+            return 0
+        return max(roll_result['roll_details']) if roll_result['roll_details'] else None
 
     def get_roll_min(self, roll_result):
-        return min(roll_result['roll_details']) if roll_result and roll_result['roll_details'] else 0
+        if not roll_result:
+            return 0
+        return min(roll_result['roll_details']) if roll_result['roll_details'] else None
 
     def get_roll_statistics(self, dice_notation, num_rolls):
         return self.dice_roller.get_roll_statistics(dice_notation, num_rolls)
 
     def save_roll_history_to_file(self, file_path):
+        import json
         roll_history = self.dice_roller.get_roll_history()
+        if file_path.endswith(".rolls"):
+            from diceroll_store import save_roll_store
+            save_roll_store(file_path, roll_history)
+            return
         with open(file_path, 'w') as file:
             json.dump(roll_history, file)
 
     def load_roll_history_from_file(self, file_path):
+        import json
+        # '.rolls' is a columnar RollStore directory: memory-mapped, rows built on access
+        if file_path.endswith(".rolls"):
+            from diceroll_store import RollStore
+            if not os.path.isdir(file_path):
+                print(f"Roll history file not found: {file_path}")
+                return []
+            roll_history = RollStore(file_path, use_mmap=True)
+            self.dice_roller.set_roll_history(roll_history)
+            return roll_history
         try:
             with open(file_path, 'r') as file:
                 roll_history = json.load(file)
@@ -114,6 +160,33 @@ class dicerollAPI:
     def disable_roll_saving(self):
         self.dice_roller.save_rolls = False
 
+    def flush_roll_history(self):
+        self.dice_roller.flush_history()
+
+    def enable_console_logging(self):
+        self.log_console = True
+
+    def disable_console_logging(self):
+        self.log_console = False
+
+    def enable_metrics(self):
+        """Times every roll by stage (parse, sample, outcome, persist); returns the Metrics object."""
+        return self.dice_roller.enable_metrics(self.dice_roller.metrics)
+
+    def disable_metrics(self):
+        self.dice_roller.disable_metrics()
+
+    def export_metrics(self, fmt="json"):
+        """The current metrics as JSON or Prometheus text ('prometheus'); None if metrics are off."""
+        metrics = self.dice_roller.metrics
+        if metrics is None:
+            return None
+        if fmt == "prometheus":
+            return metrics.to_prometheus()
+        if fmt == "json":
+            return metrics.to_json()
+        raise ValueError(f"Unknown metrics format '{fmt}'. Use 'json' or 'prometheus'.")
+
     def roll_saving_throw(self, dice_type=DiceType.D20, target_value=None, success_threshold=None):
         if success_threshold is None:
             success_threshold = target_value
@@ -128,6 +201,14 @@ class dicerollAPI:
 
         return roll_result
 
+    def check_targets(self, dice_notation, target_values, with_probabilities=False):
+        """Batch saving throws: one roll of dice_notation per target, e.g. a 500-creature area effect."""
+        try:
+            return self.dice_roller.check_targets(dice_notation, target_values, probabilities=with_probabilities)
+        except ValueError as e:
+            self._invalid_notation(dice_notation, e)
+            return None
+
     def roll_multiple_saving_throws(self, num_throws, dice_type=DiceType.D20, target_values=None, success_thresholds=None):
         if target_values is None:
             target_values = [None] * num_throws
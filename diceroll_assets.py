@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import zlib
+from datetime import datetime
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # No banner on import
+import pygame
+
+D6_COLORS = ['red', 'white', 'blue', 'black']
+BASE_SIZES = [4, 8, 10, 12, 20]
+D6_SIZE = (60, 60)
+BASE_SIZE = (70, 70)
+CACHE_FILE_NAME = "assets.cache"
+
+
+def special_day_color(today=None):
+    """'bread' on Halloween and April Fools' day, otherwise None."""
+    today = today or datetime.today()
+    if (today.month == 10 and today.day == 31) or (today.month == 4 and today.day == 1):
+        return 'bread'
+    return None
+
+
+class AssetManager:
+    """Decodes each die image once per process and keeps it pre-scaled.
+
+    D6 face sets are loaded per color, only when that color is asked for;
+    blank_dN images are loaded per size. Decoded pixels are kept as RGBA
+    bytes and also written, zlib-compressed, to one cache file, so later
+    runs build Surfaces straight from the cache without listing
+    directories or decoding JPEG/PNG. An entry is reused as long as its
+    source file's size and modification time are unchanged (or the source
+    is gone). Surfaces returned here are unconverted; convert_alpha()
+    them once a display exists.
+    """
+
+    def __init__(self, image_path="diceroll/images", cache_path=None):
+        self.image_path = image_path
+        self.cache_path = cache_path if cache_path is not None else os.path.join(image_path, CACHE_FILE_NAME)
+        self.decoded = 0 # Images decoded from source files
+        self.cache_hits = 0
+        self._surfaces = {} # key -> Surface, or None if the image does not exist
+        self._index = None # key -> [offset, length, width, height, source stamp]
+        self._blob = b""
+        self._new = {} # key -> (width, height, stamp, rgba bytes) not yet written to the cache file
+        self._lock = threading.RLock()
+
+    def dice_set(self, color):
+        """The six D6 faces for a color, or None if the set is missing."""
+        with self._lock:
+            faces = [self._image(f"{color}/{i}", os.path.join(self.image_path, color, f"dice{i}.jpg"), D6_SIZE)
+                     for i in range(1, 7)]
+            self._save()
+        faces = [face for face in faces if face is not None]
+        return faces or None
+
+    def base_image(self, size):
+        """The blank image for a dN die, or None if it is missing."""
+        with self._lock:
+            image = self._image(f"d{size}", os.path.join(self.image_path, f"blank_d{size}.png"), BASE_SIZE)
+            self._save()
+        return image
+
+    def has_images(self):
+        self._load_cache()
+        return bool(self._index) or os.path.isdir(self.image_path)
+
+    def _image(self, key, source_path, size):
+        if key in self._surfaces:
+            return self._surfaces[key]
+        self._load_cache()
+        try:
+            stat = os.stat(source_path)
+            stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+        except OSError:
+            stamp = None
+        entry = self._index.get(key)
+        surface = None
+        if entry is not None and (stamp is None or entry[4] == stamp):
+            offset, length, width, height, _ = entry
+            pixels = zlib.decompress(self._blob[offset:offset + length])
+            surface = pygame.image.frombuffer(pixels, (width, height), "RGBA")
+            self.cache_hits += 1
+        elif stamp is not None:
+            try:
+                surface = pygame.transform.scale(pygame.image.load(source_path), size)
+                self.decoded += 1
+                self._new[key] = (size[0], size[1], stamp, _rgba_bytes(surface))
+            except pygame.error as e:
+                print(f" -> Error loading {source_path}: {e}")
+        self._surfaces[key] = surface
+        return surface
+
+    def _load_cache(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        try:
+            with open(self.cache_path, "rb") as file:
+                data = file.read()
+            header_length = int.from_bytes(data[:4], "little")
+            self._index = json.loads(data[4:4 + header_length])
+            self._blob = data[4 + header_length:]
+        except (OSError, ValueError):
+            self._index = {} # Missing or unreadable cache: decode from the source files
+
+    def _save(self):
+        """Rewrites the cache file with any newly decoded images."""
+        if not self._new:
+            return
+        index = {}
+        chunks = []
+        offset = 0
+        for key, entry in self._index.items():
+            if key not in self._new:
+                chunk = self._blob[entry[0]:entry[0] + entry[1]]
+                index[key] = [offset, len(chunk)] + entry[2:]
+                chunks.append(chunk)
+                offset += len(chunk)
+        for key, (width, height, stamp, pixels) in self._new.items():
+            chunk = zlib.compress(pixels)
+            index[key] = [offset, len(chunk), width, height, stamp]
+            chunks.append(chunk)
+            offset += len(chunk)
+        header = json.dumps(index).encode()
+        self._index = index
+        self._blob = b"".join(chunks)
+        self._new = {}
+        temp_path = self.cache_path + ".tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(len(header).to_bytes(4, "little") + header + self._blob)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write image cache {self.cache_path}: {e}")
+
+    def clear(self):
+        """Forgets decoded Surfaces; the cache file is kept."""
+        with self._lock:
+            self._surfaces.clear()
+
+
+def _rgba_bytes(surface):
+    # pygame.image.tobytes replaced tostring in pygame 2.1.3
+    to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+    return to_bytes(surface, "RGBA")
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_assets(image_path="diceroll/images"):
+    """The process-wide AssetManager for an image directory."""
+    key = os.path.abspath(image_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = AssetManager(image_path)
+        return manager
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+from diceroll import DiceRoller
+from diceroll_anim import pygame, DiceAnimator, DiceColor
+
+
+class _LaneRoll:
+    """One roll being animated in a lane."""
+    __slots__ = ("roll_result", "dice_color", "done", "dice_list", "start")
+
+    def __init__(self, roll_result, dice_color, done):
+        self.roll_result = roll_result
+        self.dice_color = dice_color
+        self.done = done
+        self.dice_list = []
+        self.start = None
+
+
+class AsyncDiceAnimator(DiceAnimator):
+    """Animates rolls as asyncio tasks, several at once in one window.
+
+    roll() rolls immediately and returns the result together with a task
+    that finishes once that roll's animation has played (plus `hold`
+    seconds showing the result); cancel the task to drop the animation.
+    One render task draws every active roll at frame_rate, one per lane,
+    and yields to the event loop between frames, so game code keeps
+    running. Rolls beyond max_lanes wait for a free lane.
+
+    Set pump_events=False when the game reads pygame events itself.
+    """
+
+    def __init__(self, window_width=600, window_height=400, dice_image_path="diceroll/images",
+                 dice_roller=None, max_lanes=3, hold=1.5, pump_events=True):
+        super().__init__(window_width, window_height, dice_image_path)
+        self.dice_roller = dice_roller or DiceRoller()
+        self.max_lanes = max_lanes
+        self.hold = hold
+        self.pump_events = pump_events
+        self.lanes = [None] * max_lanes
+        self.waiting = deque()
+        self._render_task = None
+
+    def roll(self, dice_notation, dice_color=DiceColor.BLUE, target=None):
+        """Rolls now and schedules the animation. Returns (roll_result, task)."""
+        roll_result = self.dice_roller.roll_dice(dice_notation, target=target)
+        task = asyncio.get_running_loop().create_task(self.animate(roll_result, dice_color))
+        return roll_result, task
+
+    async def animate(self, roll_result, dice_color=DiceColor.BLUE):
+        """Plays the animation for an existing roll and returns the roll once it has been shown."""
+        self._open_window()
+        entry = _LaneRoll(roll_result, dice_color, asyncio.get_running_loop().create_future())
+        self.waiting.append(entry)
+        if self._render_task is None or self._render_task.done():
+            self._render_task = asyncio.get_running_loop().create_task(self._render_loop())
+        try:
+            await entry.done
+        finally:
+            self._remove(entry)
+        return roll_result
+
+    async def wait_idle(self):
+        """Waits until every queued animation has finished."""
+        if self._render_task is not None:
+            await self._render_task
+
+    def close(self):
+        """Cancels all animations and closes the window."""
+        for entry in list(self.waiting) + [entry for entry in self.lanes if entry]:
+            entry.done.cancel()
+        self.waiting.clear()
+        self.lanes = [None] * self.max_lanes
+        if self.pump_events and pygame.display.get_init():
+            pygame.display.quit()
+        self.window = None
+        self.images_processed = False
+        self.processed_dice_sets = {}
+        self.processed_base_images = {}
+
+    def _open_window(self):
+        self._init_pygame()
+        if self.window is None:
+            self.window = pygame.display.set_mode((self.window_width, self.window_height))
+            pygame.display.set_caption("Dice Roll")
+        if self._load_raw_images():
+            self._process_images()
+
+    def _remove(self, entry):
+        if entry in self.waiting:
+            self.waiting.remove(entry)
+        for lane, active in enumerate(self.lanes):
+            if active is entry:
+                self.lanes[lane] = None
+
+    def _fill_lanes(self, now):
+        lane_height = self.window_height / self.max_lanes
+        for lane in range(self.max_lanes):
+            if self.lanes[lane] is not None or not self.waiting: continue
+            entry = self.waiting.popleft()
+            roll_result = entry.roll_result
+            dice_color = self._resolve_dice_color(entry.dice_color) if self.images_processed else None
+            all_dice_defs = self._displayable_dice(roll_result['dice_notation'], dice_color, roll_result) if dice_color else None
+            if all_dice_defs:
+                center_y = lane_height * lane + lane_height / 2
+                entry.dice_list = self._layout_dice(roll_result, dice_color, all_dice_defs, center_y=center_y)
+            entry.start = now
+            self.lanes[lane] = entry
+
+    def _draw_lane(self, lane, entry, elapsed, duration):
+        surface = self.window
+        glyph = self.render_cache.glyph
+        lane_top = int(self.window_height / self.max_lanes * lane)
+        roll_result = entry.roll_result
+        surface.blit(glyph(self.font, roll_result['dice_notation'], (0, 0, 0)), (10, lane_top + 5))
+        if elapsed < duration:
+            for die in entry.dice_list:
+                die.update_animation(self.animation_style, elapsed / duration)
+                die.draw_animated(surface)
+            return
+        for die in entry.dice_list:
+            die.draw_final(surface, int(die.x), int(die.y))
+        total_text = glyph(self.font, f"Total: {roll_result['roll_result']}", (0, 0, 0))
+        surface.blit(total_text, total_text.get_rect(topright=(self.window_width - 10, lane_top + 5)))
+        if 'outcome_text' in roll_result:
+            color = (0, 128, 0) if roll_result.get('success', False) else (255, 0, 0)
+            outcome_text = glyph(self.font, roll_result['outcome_text'], color)
+            surface.blit(outcome_text, outcome_text.get_rect(topright=(self.window_width - 10, lane_top + 35)))
+
+    async def _render_loop(self):
+        frame_interval = 1.0 / self.frame_rate
+        duration = 1.0 / self.animation_speed
+        next_frame = time.monotonic()
+        while self.window is not None and (self.waiting or any(self.lanes)):
+            now = time.monotonic()
+            if self.pump_events:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.close()
+                        return
+            self._fill_lanes(now)
+
+            self.window.fill((255, 255, 255))
+            for lane, entry in enumerate(self.lanes):
+                if entry is None: continue
+                elapsed = now - entry.start
+                self._draw_lane(lane, entry, elapsed, duration)
+                if elapsed >= duration + self.hold and not entry.done.done():
+                    entry.done.set_result(entry.roll_result)
+            pygame.display.flip()
+
+            # Late frames are dropped rather than queued up
+            next_frame = max(next_frame + frame_interval, time.monotonic())
+            await asyncio.sleep(next_frame - time.monotonic())
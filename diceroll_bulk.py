@@ -0,0 +1,177 @@
+import random
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Rows generated per NumPy chunk when only totals are needed, keeps memory flat
+CHUNK_ROWS = 1 << 20
+
+
+def make_rng(seed=None):
+    """numpy.random.Generator when NumPy is available, random.Random otherwise."""
+    if np is not None:
+        return np.random.default_rng(seed)
+    return random.Random(seed)
+
+
+def roll_many(program, num_rolls, details=False, rng=None):
+    """Rolls a compiled DiceProgram num_rolls times in one batch.
+
+    Returns (totals, roll_details). totals has one entry per roll;
+    roll_details is a num_rolls x num_dice array (list of lists without
+    NumPy) when details is True, else None.
+    """
+    if rng is None:
+        rng = make_rng()
+    is_numpy = np is not None and isinstance(rng, np.random.Generator)
+    if not program.plain:
+        if details:
+            return _roll_many_each(program, num_rolls, rng, is_numpy)
+        if is_numpy:
+            return _term_totals_numpy(program, num_rolls, rng), None
+        return _term_totals_python(program, num_rolls, rng), None
+    if is_numpy:
+        totals, roll_details = _plain_numpy(program.groups, num_rolls, details, rng)
+    else:
+        totals, roll_details = _plain_python(program.groups, num_rolls, details, rng)
+    if program.modifier:
+        totals = totals + program.modifier if is_numpy else [t + program.modifier for t in totals]
+    return totals, roll_details
+
+
+def roll_best_of(program, repeats, num_rolls, highest=True, rng=None):
+    """Totals of keeping the best (or worst) of `repeats` rolls, drawn as one batch."""
+    if repeats < 1:
+        raise ValueError(f"repeats must be at least 1, got {repeats}")
+    if rng is None:
+        rng = make_rng()
+    totals, _ = roll_many(program, num_rolls * repeats, rng=rng)
+    if np is not None and isinstance(totals, np.ndarray):
+        grid = totals.reshape(num_rolls, repeats)
+        return grid.max(axis=1) if highest else grid.min(axis=1)
+    pick = max if highest else min
+    return [pick(totals[i:i + repeats]) for i in range(0, num_rolls * repeats, repeats)]
+
+
+def check_targets(program, targets, rng=None):
+    """One roll per target, sampled as one batch. Returns (totals, success flags)."""
+    totals, _ = roll_many(program, len(targets), rng=rng)
+    if np is not None and isinstance(totals, np.ndarray):
+        return totals, totals >= np.asarray(targets)
+    return totals, [total >= target for total, target in zip(totals, targets)]
+
+
+def _python_rng(rng, is_numpy):
+    # Per-roll paths need randint(); derive a random.Random from a NumPy generator
+    return random.Random(int(rng.integers(1 << 63))) if is_numpy else rng
+
+
+def _roll_many_each(program, num_rolls, rng, is_numpy):
+    """Rolls a modified program one roll at a time (kept dice vary per roll)."""
+    randint = _python_rng(rng, is_numpy).randint
+    rolls = [program.roll(randint) for _ in range(num_rolls)]
+    totals = [total for total, _ in rolls]
+    roll_details = [values for _, values in rolls]
+    return (np.array(totals, dtype=np.int64) if is_numpy else totals), roll_details
+
+
+def _term_totals_numpy(program, num_rolls, rng):
+    totals = np.full(num_rolls, program.modifier, dtype=np.int64)
+    randint = None
+    for term in program.dice_terms:
+        if term.explode is not None:
+            # Explosions grow each roll by a random amount, roll those per row
+            if randint is None:
+                randint = _python_rng(rng, True).randint
+            totals += term.sign * np.array([sum(term.roll(randint)) for _ in range(num_rolls)], dtype=np.int64)
+            continue
+        if term.reroll is not None and not term.reroll[1]:
+            values = rng.choice(np.array(term.allowed_faces(), dtype=np.int32), size=(num_rolls, term.count))
+        else:
+            values = rng.integers(1, term.sides + 1, size=(num_rolls, term.count), dtype=np.int32)
+            if term.reroll is not None:
+                compare = term.reroll[0]
+                mask = _compare_mask(compare, values)
+                values[mask] = rng.integers(1, term.sides + 1, size=int(mask.sum()), dtype=np.int32)
+        if term.keep is not None:
+            mode, n = term.keep
+            values.sort(axis=1)
+            values = values[:, values.shape[1] - min(n, term.count):] if mode == "h" else values[:, :n]
+        totals += term.sign * values.sum(axis=1, dtype=np.int64)
+    return totals
+
+
+def _compare_mask(compare, values):
+    op, target = compare
+    if op == "<":
+        return values <= target
+    if op == ">":
+        return values >= target
+    return values == target
+
+
+def _term_totals_python(program, num_rolls, rng):
+    totals = [program.modifier] * num_rolls
+    for term in program.dice_terms:
+        if term.plain and term.count:
+            sub = _plain_python(((term.count, term.sides),), num_rolls, False, rng)[0]
+        else:
+            sub = [sum(term.roll(rng.randint)) for _ in range(num_rolls)]
+        sign = term.sign
+        totals = [t + sign * v for t, v in zip(totals, sub)]
+    return totals
+
+
+def _plain_numpy(groups, num_rolls, details, rng):
+    if details:
+        columns = [rng.integers(1, size + 1, size=(num_rolls, count), dtype=np.int32)
+                   for count, size in groups]
+        roll_details = np.hstack(columns) if columns else np.zeros((num_rolls, 0), dtype=np.int32)
+        return roll_details.sum(axis=1, dtype=np.int64), roll_details
+
+    totals = np.zeros(num_rolls, dtype=np.int64)
+    for start in range(0, num_rolls, CHUNK_ROWS):
+        rows = min(CHUNK_ROWS, num_rolls - start)
+        for count, size in groups:
+            if count:
+                chunk = rng.integers(1, size + 1, size=(rows, count), dtype=np.int32)
+                totals[start:start + rows] += chunk.sum(axis=1, dtype=np.int64)
+    return totals, None
+
+
+def _plain_python(groups, num_rolls, details, rng):
+    num_dice = sum(count for count, size in groups)
+    if num_dice == 0 or num_rolls == 0:
+        return [0] * num_rolls, ([[] for _ in range(num_rolls)] if details else None)
+
+    # One choices() call per group, then regroup the flat draws into rows
+    per_group = [rng.choices(range(1, size + 1), k=num_rolls * count)
+                 for count, size in groups if count]
+    if len(per_group) == 1:
+        flat = per_group[0]
+    else:
+        counts = [count for count, size in groups if count]
+        flat = []
+        for row in range(num_rolls):
+            for draws, count in zip(per_group, counts):
+                flat.extend(draws[row * count:(row + 1) * count])
+
+    rows = zip(*[iter(flat)] * num_dice)
+    if details:
+        roll_details = [list(row) for row in rows]
+        return [sum(row) for row in roll_details], roll_details
+    return list(map(sum, rows)), None
+
+
+def histogram(totals):
+    """Returns {total: count} for a batch of totals (bincount with NumPy)."""
+    if np is not None and isinstance(totals, np.ndarray):
+        if not len(totals):
+            return {}
+        low = int(totals.min())
+        counts = np.bincount(totals - low)
+        return {low + int(i): int(c) for i, c in enumerate(counts) if c}
+    return dict(Counter(totals))
@@ -0,0 +1,167 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+DEFAULT_LOG_PATH = "roll_history.jsonl"
+DEFAULT_LAST_ROLLS_PATH = "last_5_rolls.txt"
+
+
+def write_last_rolls(file_path, last_rolls):
+    """Writes the human readable last_5_rolls.txt format."""
+    with open(file_path, "w") as file:
+        for i, roll_data in enumerate(last_rolls, 1):
+            file.write(f"Result {i}:\n")
+            file.write(f"  Dice Notation: {roll_data['dice_notation']}\n")
+            file.write(f"  Roll Result: {roll_data['roll_result']}\n")
+            file.write(f"  Roll Details: {roll_data['roll_details']}\n")
+            file.write("\n")
+
+
+class HistorySinkClosed(RuntimeError):
+    """Raised when a roll is written to a history sink that has been closed."""
+
+
+class HistorySink:
+    """Receives every saved roll. Subclass and override write/flush/close."""
+
+    def write(self, roll_data):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class BackgroundHistorySink(HistorySink):
+    """Appends rolls to a JSON-lines log from a background writer thread.
+
+    write() only enqueues, so rolling never waits on disk. The writer
+    flushes when batch_size rolls are pending or flush_interval seconds
+    have passed, and once more on close() / interpreter exit. If
+    last_rolls_path is set, that file is refreshed with the latest five
+    rolls on every flush.
+    """
+    _STOP = object()
+
+    def __init__(self, log_path=DEFAULT_LOG_PATH, last_rolls_path=DEFAULT_LAST_ROLLS_PATH,
+                 batch_size=256, flush_interval=1.0):
+        self.log_path = log_path
+        self.last_rolls_path = last_rolls_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.last_rolls = deque(maxlen=5)
+        self.rolls_written = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="diceroll-history", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, roll_data):
+        if self._closed:
+            raise HistorySinkClosed(f"History sink for {self.log_path} is closed")
+        # A copy, so later changes by the caller (e.g. roll_saving_throw) don't race the writer
+        self._queue.put(dict(roll_data))
+
+    def flush(self, timeout=10.0):
+        """Blocks until everything written so far is on disk.
+
+        Returns False if that took longer than timeout seconds or the
+        writer thread is no longer running.
+        """
+        if self._closed or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = time.monotonic() + timeout
+        while not done.wait(min(0.1, max(0.0, deadline - time.monotonic()))):
+            if not self._thread.is_alive() or time.monotonic() >= deadline:
+                return False
+        return True
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        _forget_sink(self)
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self):
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, dict):
+                pending.append(item)
+                if len(pending) < self.batch_size:
+                    continue
+            if pending:
+                self._write_batch(pending)
+                pending = []
+            deadline = time.monotonic() + self.flush_interval
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is self._STOP:
+                return
+
+    def _write_batch(self, batch):
+        # One roll at a time, so a roll that cannot be encoded only loses itself;
+        # default=str covers values like datetimes in custom outcomes
+        lines = []
+        for roll_data in batch:
+            try:
+                lines.append(json.dumps(roll_data, default=str) + "\n")
+            except (TypeError, ValueError) as e:
+                print(f"Skipping roll that cannot be saved to {self.log_path}: {e}")
+        try:
+            with open(self.log_path, "a") as file:
+                file.writelines(lines)
+            self.last_rolls.extend(batch)
+            if self.last_rolls_path:
+                write_last_rolls(self.last_rolls_path, self.last_rolls)
+            self.rolls_written += len(lines)
+        except OSError as e:
+            print(f"Error writing roll history to {self.log_path}: {e}")
+
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+
+def get_history_sink(log_path=DEFAULT_LOG_PATH, last_rolls_path=DEFAULT_LAST_ROLLS_PATH):
+    """The process-wide BackgroundHistorySink for a log file.
+
+    Rollers that save to the same file share one writer thread instead of
+    each starting their own and appending to the file concurrently.
+    """
+    key = os.path.abspath(log_path)
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None:
+            sink = _sinks[key] = BackgroundHistorySink(log_path, last_rolls_path)
+        return sink
+
+
+def _forget_sink(sink):
+    with _sinks_lock:
+        key = os.path.abspath(sink.log_path)
+        if _sinks.get(key) is sink:
+            del _sinks[key]
+
+
+def load_history_log(log_path=DEFAULT_LOG_PATH):
+    """Reads back a JSON-lines roll log written by BackgroundHistorySink."""
+    with open(log_path, "r") as file:
+        return [json.loads(line) for line in file if line.strip()]
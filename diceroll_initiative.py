@@ -0,0 +1,127 @@
+import heapq
+from itertools import count
+from diceroll import DiceRoller
+
+
+class Combatant:
+    __slots__ = ("name", "modifier", "initiative", "roll", "key", "active")
+
+    def __init__(self, name, modifier, roll):
+        self.name = name
+        self.modifier = modifier
+        self.roll = roll
+        self.initiative = roll + modifier
+        # Higher initiative first, then higher modifier, then name: no ties left to reroll
+        self.key = (-self.initiative, -modifier, name)
+        self.active = True
+
+    def __repr__(self):
+        return f"Combatant({self.name!r}, initiative={self.initiative})"
+
+
+class InitiativeTracker:
+    """Turn order for a battle, built on one DiceRoller.
+
+    Combatants are rolled in one batch (roll_many) with per-combatant
+    modifiers. Ties are broken by modifier and then name, so the order is
+    always deterministic. Each round is a heap of the combatants, and
+    removal is lazy, so add/remove/delay cost O(log n) mid-round.
+    reroll() redraws only the given combatants between rounds.
+    """
+
+    def __init__(self, dice_roller=None, dice_notation="1d20"):
+        self.dice_roller = dice_roller or DiceRoller()
+        self.dice_notation = dice_notation
+        self.combatants = {}
+        self.round = 0
+        self.current = None # Whose turn it is
+        self._heap = [] # Current round: (key, seq, combatant) still to act
+        self._acted = set() # Names that have had their turn this round
+        self._seq = count()
+
+    def _roll(self, num_rolls):
+        totals = self.dice_roller.roll_many(self.dice_notation, num_rolls)["totals"]
+        return totals.tolist() if hasattr(totals, "tolist") else totals
+
+    def add(self, name, modifier=0, initiative=None):
+        """Adds one combatant; initiative is rolled unless given. Joins the current round if still to act."""
+        return self.add_many([(name, modifier)], None if initiative is None else [initiative])[0]
+
+    def add_many(self, combatants, initiatives=None):
+        """Adds (name, modifier) pairs, rolling all their initiatives in one batch."""
+        names = [name for name, _ in combatants]
+        duplicates = [name for name in names if name in self.combatants]
+        if duplicates or len(set(names)) != len(names):
+            raise ValueError(f"Combatant names must be unique: {', '.join(duplicates) or 'repeated in batch'}")
+        rolls = self._roll(len(combatants)) if initiatives is None else [i - m for i, (_, m) in zip(initiatives, combatants)]
+        added = []
+        for (name, modifier), roll in zip(combatants, rolls):
+            combatant = Combatant(name, modifier, roll)
+            self.combatants[name] = combatant
+            self._push(combatant)
+            added.append(combatant)
+        return added
+
+    def remove(self, name):
+        combatant = self.combatants.pop(name)
+        combatant.active = False # Its heap entry is skipped when popped
+
+    def reroll(self, names=None):
+        """Re-rolls the named combatants (default: everyone) in one batch; call between rounds."""
+        names = list(self.combatants) if names is None else list(names)
+        rolls = self._roll(len(names))
+        for name, roll in zip(names, rolls):
+            old = self.combatants[name]
+            old.active = False
+            combatant = Combatant(name, old.modifier, roll)
+            self.combatants[name] = combatant
+            self._push(combatant)
+
+    def delay(self, name, after=None):
+        """Moves a combatant to act right after another one (or last), for the rest of the battle.
+
+        Delaying the combatant whose turn it is puts them back into the current round.
+        """
+        old = self.combatants[name]
+        old.active = False
+        combatant = Combatant(name, old.modifier, old.roll)
+        if after is None:
+            combatant.key = (float("inf"), next(self._seq))
+        else:
+            # Extending a key sorts it after that key but before anything that came after it
+            combatant.key = self.combatants[after].key + (next(self._seq),)
+        self.combatants[name] = combatant
+        if self.current is not None and self.current.name == name:
+            self._acted.discard(name)
+            self.current = None
+        self._push(combatant)
+
+    def _push(self, combatant):
+        # Mid-round changes only affect this round for combatants still to act
+        if self.round and combatant.name not in self._acted:
+            heapq.heappush(self._heap, (combatant.key, next(self._seq), combatant))
+
+    def start_round(self):
+        """Begins the next round with everyone in initiative order."""
+        self.round += 1
+        self.current = None
+        self._acted = set()
+        self._heap = [(combatant.key, next(self._seq), combatant) for combatant in self.combatants.values()]
+        heapq.heapify(self._heap)
+        return self.round
+
+    def next_turn(self):
+        """The combatant whose turn it is, or None when the round is over."""
+        heap = self._heap
+        while heap:
+            combatant = heapq.heappop(heap)[2]
+            if combatant.active and combatant.name not in self._acted:
+                self._acted.add(combatant.name)
+                self.current = combatant
+                return combatant
+        self.current = None
+        return None
+
+    def order(self):
+        """All combatants in initiative order as (name, initiative) pairs."""
+        return [(c.name, c.initiative) for c in sorted(self.combatants.values(), key=lambda c: c.key)]
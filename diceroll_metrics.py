@@ -0,0 +1,190 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+STAGES = ("parse", "sample", "outcome", "persist", "roll")
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 0.1, 1.0)
+
+
+class StageTimer:
+    """Count, sum, max and a bucketed histogram of one stage's durations."""
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1) # Last bucket is +Inf
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (0-1)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else 0.0,
+            "max_seconds": self.max,
+            "p50_seconds": self.quantile(0.50),
+            "p99_seconds": self.quantile(0.99),
+        }
+
+
+class Metrics:
+    """Per-stage timers and counters for a DiceRoller.
+
+    Stages are parse, sample, outcome (target/outcome rules) and persist
+    (history and sink), plus 'roll' for the whole call. Rollers without
+    metrics skip all of this behind one attribute check. snapshot()
+    returns plain data; to_json() and to_prometheus() export it for
+    graphing rolls/sec and tail latency.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.timers = {stage: StageTimer() for stage in STAGES}
+        self.counters = {"rolls": 0, "dice": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def record_roll(self, num_dice, parse, sample, outcome, persist):
+        with self._lock:
+            timers = self.timers
+            timers["parse"].add(parse)
+            timers["sample"].add(sample)
+            timers["outcome"].add(outcome)
+            timers["persist"].add(persist)
+            timers["roll"].add(parse + sample + outcome + persist)
+            self.counters["rolls"] += 1
+            self.counters["dice"] += num_dice
+
+    def record(self, stage, seconds):
+        with self._lock:
+            timer = self.timers.get(stage)
+            if timer is None:
+                timer = self.timers[stage] = StageTimer()
+            timer.add(seconds)
+
+    def count(self, counter, n=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    @contextmanager
+    def timed(self, stage):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - began)
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.timers = {stage: StageTimer() for stage in STAGES}
+            self.counters = {"rolls": 0, "dice": 0, "errors": 0}
+
+    def snapshot(self):
+        with self._lock:
+            uptime = time.time() - self.started
+            return {
+                "uptime_seconds": uptime,
+                "rolls_per_second": self.counters["rolls"] / uptime if uptime > 0 else 0.0,
+                "counters": dict(self.counters),
+                "stages": {stage: timer.as_dict() for stage, timer in self.timers.items()},
+            }
+
+    def to_json(self, indent=None):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix="diceroll"):
+        """Prometheus text exposition format."""
+        with self._lock:
+            lines = []
+            for counter, value in self.counters.items():
+                lines.append(f"# TYPE {prefix}_{counter}_total counter")
+                lines.append(f"{prefix}_{counter}_total {value}")
+            lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+            for stage, timer in self.timers.items():
+                cumulative = 0
+                for bound, n in zip(BUCKETS, timer.buckets):
+                    cumulative += n
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {timer.count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {timer.total!r}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {timer.count}')
+            return "\n".join(lines) + "\n"
+
+
+class ProfileResult:
+    """What profile() captured: cProfile stats text and, with memory=True, tracemalloc's top allocations."""
+
+    def __init__(self):
+        self.profiler = None
+        self.stats_text = ""
+        self.memory_top = []
+        self.peak_memory = 0
+
+    def __str__(self):
+        text = self.stats_text
+        if self.memory_top:
+            text += f"\nPeak traced memory: {self.peak_memory} bytes\n" + "\n".join(self.memory_top) + "\n"
+        return text
+
+
+@contextmanager
+def profile(sort="cumulative", limit=25, memory=False, path=None):
+    """Profiles a block of rolls with cProfile (and tracemalloc if memory=True).
+
+        with profile(memory=True) as result:
+            for _ in range(100000):
+                roller.roll_dice("4d6kh3")
+        print(result)
+
+    path also dumps the raw cProfile stats for snakeviz/pstats.
+    """
+    import cProfile
+    import io
+    import pstats
+    result = ProfileResult()
+    if memory:
+        import tracemalloc
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        if memory:
+            # Taken before the stats are formatted, and without the profiler's own allocations
+            result.peak_memory = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+            ])
+            tracemalloc.stop()
+            result.memory_top = [str(stat) for stat in snapshot.statistics("lineno")[:limit]]
+        result.profiler = profiler
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats(sort).print_stats(limit)
+        result.stats_text = buffer.getvalue()
+        if path is not None:
+            profiler.dump_stats(path)
@@ -0,0 +1,334 @@
+import random
+import threading
+from collections import OrderedDict
+
+# Upper bound on extra dice added by one exploding die
+MAX_EXPLOSIONS = 100
+
+
+def compare_hits(compare, value):
+    """compare is (op, target). '<' means at most, '>' at least, '=' exactly."""
+    op, target = compare
+    if op == "<":
+        return value <= target
+    if op == ">":
+        return value >= target
+    return value == target
+
+
+class Constant:
+    """A flat modifier such as the '+5' in '1d20+5'."""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return f"{self.value:+d}"
+
+
+class DiceTerm:
+    """One group of identical dice with its modifiers, e.g. '-4d6kh3' or '2d10!'.
+
+    keep is (mode, n) with mode 'h' or 'l'; explode is a compare tuple;
+    reroll is (compare, once).
+    """
+    __slots__ = ("count", "sides", "sign", "keep", "explode", "reroll")
+
+    def __init__(self, count, sides, sign=1, keep=None, explode=None, reroll=None):
+        self.count = count
+        self.sides = sides
+        self.sign = sign
+        self.keep = keep
+        self.explode = explode
+        self.reroll = reroll
+
+    @property
+    def plain(self):
+        return self.keep is None and self.explode is None and self.reroll is None
+
+    @property
+    def kept_count(self):
+        return self.count if self.keep is None else min(self.count, self.keep[1])
+
+    def allowed_faces(self):
+        """Faces a die can finally show after rerolls."""
+        faces = range(1, self.sides + 1)
+        if self.reroll is None or self.reroll[1]:
+            return list(faces)
+        return [face for face in faces if not compare_hits(self.reroll[0], face)]
+
+    def roll(self, randint):
+        sides = self.sides
+        values = []
+        for _ in range(self.count):
+            value = randint(1, sides)
+            if self.reroll is not None:
+                compare, once = self.reroll
+                if once:
+                    if compare_hits(compare, value):
+                        value = randint(1, sides)
+                else:
+                    while compare_hits(compare, value):
+                        value = randint(1, sides)
+            values.append(value)
+            if self.explode is not None:
+                explosions = 0
+                while compare_hits(self.explode, value) and explosions < MAX_EXPLOSIONS:
+                    value = randint(1, sides)
+                    values.append(value)
+                    explosions += 1
+        if self.keep is not None:
+            mode, n = self.keep
+            order = sorted(range(len(values)), key=values.__getitem__, reverse=(mode == "h"))
+            values = [values[i] for i in sorted(order[:n])]
+        return values
+
+    def __str__(self):
+        text = f"{'-' if self.sign < 0 else '+'}{self.count}d{self.sides}"
+        if self.reroll is not None:
+            (op, target), once = self.reroll
+            text += f"{'ro' if once else 'r'}{'' if op == '=' else op}{target}"
+        if self.explode is not None:
+            op, target = self.explode
+            text += f"!{'' if op == '=' else op}{target}"
+        if self.keep is not None:
+            text += f"k{self.keep[0]}{self.keep[1]}"
+        return text
+
+
+class DiceProgram:
+    """A parsed dice notation, compiled once and reused for every roll."""
+    __slots__ = ("notation", "terms", "dice_terms", "modifier", "plain",
+                 "groups", "dice_defs", "num_dice", "canonical")
+
+    def __init__(self, notation, terms):
+        self.notation = notation
+        self.terms = tuple(terms)
+        self.dice_terms = tuple(term for term in self.terms if isinstance(term, DiceTerm))
+        self.modifier = sum(term.value for term in self.terms if isinstance(term, Constant))
+        # Plain programs are only added, unmodified dice and take the fast paths
+        self.plain = all(term.plain and term.sign > 0 for term in self.dice_terms)
+        self.groups = tuple((term.count, term.sides) for term in self.dice_terms) # ((number_of_dice, dice_size), ...)
+        self.dice_defs = tuple(term.sides for term in self.dice_terms for _ in range(term.kept_count))
+        self.num_dice = len(self.dice_defs)
+        self.canonical = "".join(str(term) for term in self.dice_terms).lstrip("+")
+        if self.modifier:
+            self.canonical += f"{self.modifier:+d}"
+
+    def roll(self, randint=random.randint):
+        """Rolls the whole expression once. Returns (roll_sum, roll_details).
+
+        roll_details holds the face values of the dice that count (kept dice,
+        including extra dice from explosions).
+        """
+        if self.plain:
+            roll_results = [randint(1, size) for size in self.dice_defs]
+            return sum(roll_results) + self.modifier, roll_results
+        roll_sum = self.modifier
+        roll_results = []
+        for term in self.dice_terms:
+            values = term.roll(randint)
+            roll_results.extend(values)
+            roll_sum += term.sign * sum(values)
+        return roll_sum, roll_results
+
+    def __repr__(self):
+        return f"DiceProgram({self.notation!r}, canonical={self.canonical!r})"
+
+
+class _Parser:
+    """Recursive-descent parser for dice notation.
+
+    expression := ['+'|'-'] term (('+'|'-') term)*
+    term       := number | [count] 'd' (sides | '%') modifier*
+    modifier   := ('kh'|'kl'|'k'|'dh'|'dl') number
+                | ('r'|'ro') compare | '!' [compare]
+    compare    := ['<'|'>'|'='] number
+    """
+
+    def __init__(self, dice_notation):
+        self.notation = dice_notation
+        self.text = self.strip_spaces(dice_notation.strip().lower())
+        self.pos = 0
+
+    def strip_spaces(self, text):
+        """Drops whitespace around '+'/'-'. Anywhere else it would join tokens ('1d6 2' as '1d62'), so it is an error."""
+        chars = []
+        i = 0
+        while i < len(text):
+            if not text[i].isspace():
+                chars.append(text[i])
+                i += 1
+                continue
+            start = i
+            while i < len(text) and text[i].isspace():
+                i += 1
+            if chars[-1] not in ("+", "-") and text[i] not in ("+", "-"):
+                raise self.error(f"Unexpected space at position {start}.")
+        return "".join(chars)
+
+    def error(self, message):
+        return ValueError(f"Invalid dice notation: {self.notation}. {message} Expected format like '1d6', '2d8+1d4' or '4d6kh3+2'.")
+
+    def peek(self, length=1):
+        return self.text[self.pos:self.pos + length]
+
+    def number(self, required=True):
+        start = self.pos
+        while self.pos < len(self.text) and self.text[self.pos].isdigit():
+            self.pos += 1
+        if start == self.pos:
+            if required:
+                raise self.error(f"Expected a number at position {start}.")
+            return None
+        return int(self.text[start:self.pos])
+
+    def compare(self, default=None):
+        op = "="
+        if self.peek() in ("<", ">", "="):
+            op = self.peek()
+            self.pos += 1
+        target = self.number(required=(default is None or op != "="))
+        if target is None:
+            return default
+        return (op, target)
+
+    def parse(self):
+        if not self.text:
+            raise ValueError(f"No dice found to roll in: {self.notation}")
+        terms = []
+        sign = 1
+        if self.peek() in ("+", "-"):
+            sign = -1 if self.peek() == "-" else 1
+            self.pos += 1
+        while True:
+            terms.append(self.term(sign))
+            if self.pos == len(self.text):
+                break
+            if self.peek() not in ("+", "-"):
+                raise self.error(f"Unexpected '{self.peek()}' at position {self.pos}.")
+            sign = -1 if self.peek() == "-" else 1
+            self.pos += 1
+        if not any(isinstance(term, DiceTerm) for term in terms):
+            raise ValueError(f"No dice found to roll in: {self.notation}")
+        return terms
+
+    def term(self, sign):
+        count = self.number(required=False)
+        if self.peek() != "d":
+            if count is None:
+                raise self.error(f"Expected dice or a number at position {self.pos}.")
+            return Constant(sign * count)
+        self.pos += 1
+        if self.peek() == "%":
+            self.pos += 1
+            sides = 100
+        else:
+            sides = self.number()
+        if sides < 1:
+            raise self.error("Dice need at least one side.")
+        term = DiceTerm(1 if count is None else count, sides, sign)
+        self.modifiers(term)
+        return term
+
+    def modifiers(self, term):
+        while self.pos < len(self.text) and self.peek() not in ("+", "-"):
+            if self.peek(2) in ("kh", "kl", "dh", "dl"):
+                mode = self.peek(2)
+                self.pos += 2
+                self.keep(term, mode)
+            elif self.peek() == "k":
+                self.pos += 1
+                self.keep(term, "kh")
+            elif self.peek(2) == "ro" or self.peek() == "r":
+                once = self.peek(2) == "ro"
+                self.pos += 2 if once else 1
+                if term.reroll is not None:
+                    raise self.error("Only one reroll modifier per dice group.")
+                compare = self.compare()
+                term.reroll = (compare, once)
+                if not once and not any(not compare_hits(compare, f) for f in range(1, term.sides + 1)):
+                    raise self.error("Reroll condition matches every face.")
+            elif self.peek() == "!":
+                self.pos += 1
+                if term.explode is not None:
+                    raise self.error("Only one explode modifier per dice group.")
+                term.explode = self.compare(default=("=", term.sides))
+                if compare_hits(term.explode, 1) and compare_hits(term.explode, term.sides):
+                    raise self.error("Explode condition matches every face.")
+            else:
+                raise self.error(f"Unknown modifier '{self.peek()}' at position {self.pos}.")
+
+    def keep(self, term, mode):
+        if term.keep is not None:
+            raise self.error("Only one keep/drop modifier per dice group.")
+        n = self.number()
+        if mode[0] == "d": # Drop n highest/lowest == keep the rest from the other end
+            term.keep = ("l" if mode == "dh" else "h", max(0, term.count - n))
+        else:
+            term.keep = (mode[1], n)
+
+
+def parse_notation(dice_notation):
+    """Parses a notation string into a DiceProgram (uncached)."""
+    return DiceProgram(dice_notation, _Parser(dice_notation).parse())
+
+
+class ProgramCache:
+    """Bounded LRU cache of DiceProgram objects keyed by notation string."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._programs = OrderedDict()
+        self._lock = threading.Lock() # Shared by every thread rolling through a DiceRoller
+
+    def get(self, dice_notation):
+        with self._lock:
+            program = self._programs.get(dice_notation)
+            if program is not None:
+                self.hits += 1
+                self._programs.move_to_end(dice_notation)
+                return program
+            self.misses += 1
+        # Parsed outside the lock; a concurrent miss on the same notation just parses twice
+        program = parse_notation(dice_notation)
+        with self._lock:
+            self._programs[dice_notation] = program
+            while len(self._programs) > self.maxsize:
+                self._programs.popitem(last=False)
+        return program
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._programs) > self.maxsize:
+                self._programs.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._programs.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._programs),
+        }
+
+
+program_cache = ProgramCache()
+
+
+def compile_notation(dice_notation):
+    """Returns the shared, cached DiceProgram for a notation string."""
+    return program_cache.get(dice_notation)
+
+
+def notation_cache_info():
+    return program_cache.info()
@@ -0,0 +1,181 @@
+from bisect import bisect_right
+from diceroll_notation import compile_notation
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class OutcomeDeterminer:
+    """Decides what a roll against a target means.
+
+    Subclass and override determine_outcome for custom rules; DiceRoller
+    calls it once per roll (the slow path). For tiered rules that can be
+    evaluated in bulk, use OutcomeRules.
+    """
+
+    @staticmethod
+    def determine_outcome(roll_result, target, success_outcome, failure_outcome):
+        """The built-in rule: success_outcome if the total is at least target, else failure_outcome."""
+        return success_outcome if roll_result["roll_result"] >= target else failure_outcome
+
+
+class OutcomeRules(OutcomeDeterminer):
+    """Declarative outcome tiers compiled into a sorted threshold table.
+
+    tiers is a list of (name, threshold) pairs; a total lands in the
+    highest tier whose threshold it reaches, and the lowest tier's
+    threshold may be None (everything below the next one). With
+    relative=True thresholds are margins over the target, so
+    [("fail", None), ("partial", -3), ("success", 0), ("crit", 10)]
+    means "within 3 of the target is a partial success".
+
+    natural maps the face of the one kept die to a tier that overrides
+    the total, e.g. {20: "crit", 1: "fail"} for 1d20+5 or 2d20kh1+5. It
+    applies only to notations natural_term accepts. success names
+    the lowest tier that counts as a success (default: the tier a total
+    equal to the target lands in, or the second tier for absolute
+    rules). degree_step adds 'degree': the margin over the target in
+    whole steps (e.g. every 5 points is one degree of success).
+    """
+
+    def __init__(self, tiers, relative=False, natural=None, success=None, degree_step=None):
+        tiers = sorted(tiers, key=lambda tier: float("-inf") if tier[1] is None else tier[1])
+        if not tiers:
+            raise ValueError("OutcomeRules needs at least one tier")
+        if any(threshold is None for _, threshold in tiers[1:]):
+            raise ValueError("Only the lowest tier may have no threshold")
+        self.names = [name for name, _ in tiers]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Tier names must be unique")
+        self.thresholds = [threshold for _, threshold in tiers[1:]] # Lower bounds of tiers 1..n
+        self.relative = relative
+        self.natural = dict(natural or {})
+        self.natural_index = {face: self._index_of(name) for face, name in self.natural.items()}
+        self.degree_step = degree_step
+        if success is not None:
+            self.success_index = self._index_of(success)
+        elif relative:
+            self.success_index = bisect_right(self.thresholds, 0)
+        else:
+            self.success_index = min(1, len(self.names) - 1)
+        self._threshold_array = np.asarray(self.thresholds, dtype=np.int64) if np is not None else None
+
+    def _index_of(self, name):
+        try:
+            return self.names.index(name)
+        except ValueError:
+            raise ValueError(f"Unknown tier '{name}'. Tiers are: {', '.join(self.names)}") from None
+
+    @staticmethod
+    def natural_term(program):
+        """The dice term whose face is the natural roll, or None if natural rules do not apply.
+
+        That is a single added dice term, plus flat modifiers, that keeps
+        exactly one die and neither explodes nor rerolls: '1d20+5', '2d20kh1'.
+        """
+        if len(program.dice_terms) != 1:
+            return None
+        term = program.dice_terms[0]
+        if term.sign < 0 or term.explode is not None or term.reroll is not None or term.kept_count != 1:
+            return None
+        return term
+
+    def _margin(self, total, target):
+        if not self.relative:
+            return total
+        if target is None:
+            raise ValueError("Relative outcome rules need a target")
+        return total - target
+
+    def tier_index(self, total, target=None, natural=None):
+        """Index into names for one total (natural is the face of a single-die roll)."""
+        index = self.natural_index.get(natural) if natural is not None else None
+        if index is None:
+            index = bisect_right(self.thresholds, self._margin(total, target))
+        return index
+
+    def classify(self, total, target=None, natural=None):
+        return self.names[self.tier_index(total, target, natural)]
+
+    def classify_many(self, totals, target=None, naturals=None):
+        """Tier indexes for a batch of totals: numpy.searchsorted with NumPy, bisect without.
+
+        Returns an index array (list without NumPy); map through names for tier names.
+        """
+        if self.relative and target is None:
+            raise ValueError("Relative outcome rules need a target")
+        if np is not None:
+            values = np.asarray(totals, dtype=np.int64)
+            if self.relative:
+                values = values - target
+            indexes = np.searchsorted(self._threshold_array, values, side="right")
+            if self.natural and naturals is not None:
+                naturals = np.asarray(naturals)
+                for face, index in self.natural_index.items():
+                    indexes = np.where(naturals == face, index, indexes)
+            return indexes
+        offset = target if self.relative else 0
+        thresholds = self.thresholds
+        indexes = [bisect_right(thresholds, total - offset) for total in totals]
+        if self.natural and naturals is not None:
+            natural_index = self.natural_index
+            indexes = [natural_index.get(face, index) for face, index in zip(naturals, indexes)]
+        return indexes
+
+    def count_tiers(self, indexes):
+        """{tier name: number of rolls} for the output of classify_many."""
+        if np is not None and isinstance(indexes, np.ndarray):
+            counts = np.bincount(indexes, minlength=len(self.names)).tolist()
+        else:
+            counts = [0] * len(self.names)
+            for index in indexes:
+                counts[index] += 1
+        return dict(zip(self.names, counts))
+
+    def degree(self, total, target):
+        return (total - target) // self.degree_step
+
+    def determine_outcome(self, roll_result, target, success_outcome=None, failure_outcome=None):
+        """Fills tier, success and degree into a roll dict (the DiceRoller hook)."""
+        details = roll_result["roll_details"]
+        natural = None
+        if self.natural and len(details) == 1 and self.natural_term(compile_notation(roll_result["dice_notation"])):
+            natural = details[0]
+        index = self.tier_index(roll_result["roll_result"], target, natural)
+        outcome = {"tier": self.names[index], "success": index >= self.success_index}
+        if self.degree_step and target is not None:
+            outcome["degree"] = self.degree(roll_result["roll_result"], target)
+        return outcome
+
+    def tier_probabilities(self, dice_notation, target=None, exact=False):
+        """Exact chance of each tier for one roll, from the distribution engine."""
+        from diceroll_prob import get_distribution
+        counts = [0] * len(self.names)
+        if self.natural:
+            program = compile_notation(dice_notation)
+            term = self.natural_term(program)
+            if term is None:
+                raise ValueError("Natural-roll rules need a notation that keeps one die, e.g. '1d20+5' or '2d20kh1'")
+            sides, n = term.sides, term.count
+            total_outcomes = sides ** n
+            for face in range(1, sides + 1):
+                # Ways the kept die shows this face: all n dice at most (or at least) face, minus those without it
+                if term.keep is None:
+                    ways = 1
+                elif term.keep[0] == "h":
+                    ways = face ** n - (face - 1) ** n
+                else:
+                    ways = (sides - face + 1) ** n - (sides - face) ** n
+                counts[self.tier_index(face + program.modifier, target, face)] += ways
+        else:
+            dist = get_distribution(dice_notation)
+            total_outcomes = dist.total
+            for value, count in zip(dist.values(), dist.counts):
+                if count:
+                    counts[self.tier_index(value, target)] += count
+        if exact:
+            from fractions import Fraction
+            return {name: Fraction(count, total_outcomes) for name, count in zip(self.names, counts)}
+        return {name: count / total_outcomes for name, count in zip(self.names, counts)}
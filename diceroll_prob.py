@@ -0,0 +1,410 @@
+import threading
+from collections import OrderedDict
+from math import comb
+from diceroll_notation import compile_notation, compare_hits
+
+
+class Distribution:
+    """Exact distribution of a dice total.
+
+    counts[i] is the number of equally likely outcomes whose total is
+    min_total + i; total is the number of outcomes overall.
+    """
+    __slots__ = ("min_total", "counts", "total")
+
+    def __init__(self, min_total, counts, total=None):
+        self.min_total = min_total
+        self.counts = counts
+        self.total = sum(counts) if total is None else total
+
+    @property
+    def max_total(self):
+        return self.min_total + len(self.counts) - 1
+
+    def values(self):
+        return list(range(self.min_total, self.max_total + 1))
+
+    def add_die(self, dice_size, number_of_dice=1):
+        """Adds number_of_dice dice of dice_size faces, one sliding-window pass per die."""
+        counts = self.counts
+        for _ in range(number_of_dice):
+            running = 0
+            new_counts = []
+            for i in range(len(counts) + dice_size - 1):
+                if i < len(counts):
+                    running += counts[i]
+                if i >= dice_size:
+                    running -= counts[i - dice_size]
+                new_counts.append(running)
+            counts = new_counts
+        return Distribution(self.min_total + number_of_dice, counts, self.total * dice_size ** number_of_dice)
+
+    def convolve(self, other):
+        """Distribution of the sum of two independent totals."""
+        counts = [0] * (len(self.counts) + len(other.counts) - 1)
+        for i, a in enumerate(self.counts):
+            if not a:
+                continue
+            for j, b in enumerate(other.counts):
+                counts[i + j] += a * b
+        return Distribution(self.min_total + other.min_total, counts, self.total * other.total)
+
+    def count(self, value):
+        index = value - self.min_total
+        if 0 <= index < len(self.counts):
+            return self.counts[index]
+        return 0
+
+    def probability(self, value):
+        return self.count(value) / self.total
+
+    def pmf(self, exact=False):
+        return [self._ratio(c, exact) for c in self.counts]
+
+    def cdf(self, exact=False):
+        """P(total <= value) for each value."""
+        running = 0
+        result = []
+        for c in self.counts:
+            running += c
+            result.append(self._ratio(running, exact))
+        return result
+
+    def survival(self, exact=False):
+        """P(total >= value) for each value, i.e. the chance of meeting a target."""
+        running = 0
+        result = []
+        for c in reversed(self.counts):
+            running += c
+            result.append(self._ratio(running, exact))
+        result.reverse()
+        return result
+
+    def tables(self, exact=False):
+        """Returns values, PMF, CDF and survival arrays in one call."""
+        return {
+            "values": self.values(),
+            "pmf": self.pmf(exact),
+            "cdf": self.cdf(exact),
+            "survival": self.survival(exact),
+        }
+
+    def as_dict(self, exact=False):
+        return dict(zip(self.values(), self.pmf(exact)))
+
+    def best_of(self, repeats):
+        """Distribution of the highest of `repeats` independent totals: P(max <= x) = F(x)^N."""
+        if repeats < 1:
+            raise ValueError(f"repeats must be at least 1, got {repeats}")
+        counts = []
+        below = 0
+        running = 0
+        for c in self.counts:
+            running += c
+            counts.append(running ** repeats - below)
+            below = running ** repeats
+        return Distribution(self.min_total, counts, self.total ** repeats)
+
+    def worst_of(self, repeats):
+        """Distribution of the lowest of `repeats` independent totals: P(min >= x) = S(x)^N."""
+        if repeats < 1:
+            raise ValueError(f"repeats must be at least 1, got {repeats}")
+        counts = []
+        above = 0
+        running = 0
+        for c in reversed(self.counts):
+            running += c
+            counts.append(running ** repeats - above)
+            above = running ** repeats
+        counts.reverse()
+        return Distribution(self.min_total, counts, self.total ** repeats)
+
+    def at_least(self, target, exact=False):
+        """P(total >= target)."""
+        index = max(0, target - self.min_total)
+        return self._ratio(sum(self.counts[index:]), exact)
+
+    def shift(self, offset):
+        return Distribution(self.min_total + offset, self.counts, self.total)
+
+    def negate(self):
+        return Distribution(-self.max_total, self.counts[::-1], self.total)
+
+    def nbytes(self):
+        """Rough memory footprint, used for the cache's byte budget."""
+        return 64 + sum(28 + c.bit_length() // 8 for c in self.counts)
+
+    def mean(self):
+        return sum((self.min_total + i) * c for i, c in enumerate(self.counts)) / self.total
+
+    def _ratio(self, count, exact):
+        if exact:
+            from fractions import Fraction
+            return Fraction(count, self.total)
+        return count / self.total
+
+    def __repr__(self):
+        return f"Distribution({self.min_total}..{self.max_total}, outcomes={self.total})"
+
+
+CONSTANT_ZERO = Distribution(0, [1])
+
+
+def dice_distribution(number_of_dice, dice_size):
+    return CONSTANT_ZERO.add_die(dice_size, number_of_dice)
+
+
+def face_weights(term):
+    """Outcome counts for each face of one die after rerolls (index 0 is face 1)."""
+    sides = term.sides
+    if term.reroll is None:
+        return [1] * sides
+    compare, once = term.reroll
+    hit = [compare_hits(compare, face) for face in range(1, sides + 1)]
+    if not once:
+        return [0 if h else 1 for h in hit]
+    # Reroll once: keep a non-matching first roll, or take any second roll
+    rerolled = sum(hit)
+    return [(0 if h else sides) + rerolled for h in hit]
+
+
+def keep_distribution(count, keep, weights):
+    """Distribution of the sum of the kept dice out of count weighted dice.
+
+    Assigns dice to faces from the kept end inwards, so the first n dice
+    placed are the kept ones; multinomial factors count the orderings.
+    """
+    mode, n = keep
+    n = min(n, count)
+    faces = range(len(weights), 0, -1) if mode == "h" else range(1, len(weights) + 1)
+    states = {(0, 0): 1} # (dice placed, kept sum) -> outcome count
+    for face in faces:
+        weight = weights[face - 1]
+        new_states = {}
+        for (placed, kept_sum), ways in states.items():
+            remaining = count - placed
+            for c in range(remaining + 1):
+                if c and not weight:
+                    break
+                kept = min(c, max(0, n - placed))
+                key = (placed + c, kept_sum + kept * face)
+                new_states[key] = new_states.get(key, 0) + ways * comb(remaining, c) * weight ** c
+        states = new_states
+    sums = {kept_sum: ways for (placed, kept_sum), ways in states.items() if placed == count and ways}
+    low = min(sums)
+    counts = [sums.get(value, 0) for value in range(low, max(sums) + 1)]
+    return Distribution(low, counts, sum(weights) ** count)
+
+
+def term_distribution(term):
+    if term.explode is not None:
+        raise ValueError(f"Exploding dice have no finite exact distribution: {str(term).lstrip('+')}. Use sampling instead.")
+    if term.keep is not None:
+        dist = keep_distribution(term.count, term.keep, face_weights(term))
+    elif term.reroll is None:
+        dist = CONSTANT_ZERO.add_die(term.sides, term.count)
+    else:
+        weights = face_weights(term)
+        first = next(i for i, w in enumerate(weights) if w)
+        last = len(weights) - next(i for i, w in enumerate(reversed(weights)) if w)
+        die = Distribution(first + 1, weights[first:last], sum(weights))
+        dist = CONSTANT_ZERO
+        for _ in range(term.count):
+            dist = dist.convolve(die)
+    return dist.negate() if term.sign < 0 else dist
+
+
+def program_distribution(program):
+    dist = CONSTANT_ZERO
+    for term in program.dice_terms:
+        if term.plain and term.sign > 0:
+            dist = dist.add_die(term.sides, term.count)
+        else:
+            dist = dist.convolve(term_distribution(term))
+    return dist.shift(program.modifier)
+
+
+def distribution_key(program):
+    """Order-independent key: '1d4+3d8' and '3d8+1d4' share one entry, as do '2d6+1d6' and '3d6'."""
+    plain = {}
+    others = []
+    for term in program.dice_terms:
+        if term.plain and term.sign > 0:
+            plain[term.sides] = plain.get(term.sides, 0) + term.count
+        else:
+            others.append(str(term))
+    parts = [f"+{count}d{sides}" for sides, count in sorted(plain.items()) if count] + sorted(others)
+    key = "".join(parts).lstrip("+") or "0"
+    if program.modifier:
+        key += f"{program.modifier:+d}"
+    return key
+
+
+class DistributionCache:
+    """Memoizes exact distributions by normalized expression.
+
+    Entries live in an LRU bounded by an approximate byte budget and,
+    if path is given, in a sqlite file that survives restarts. Plain NdS
+    pools are derived from the largest cached pool of the same die
+    (10d6 from a cached 8d6 plus 2d6), and mixed expressions are built
+    from cached per-term pieces.
+    """
+
+    def __init__(self, max_bytes=16 << 20, path=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.derived = 0
+        self._entries = OrderedDict()
+        self._pools = {} # dice_size -> set of cached pool sizes
+        self._lock = threading.RLock()
+        self._db = None
+        if path is not None:
+            import sqlite3
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS distributions (key TEXT PRIMARY KEY, data TEXT)")
+            self._db.commit()
+
+    def get(self, program):
+        key = distribution_key(program)
+        with self._lock:
+            dist = self._lookup(key)
+            if dist is not None:
+                self.hits += 1
+                return dist
+            self.misses += 1
+            dist = CONSTANT_ZERO
+            for sides, count in self._plain_pools(program):
+                dist = dist.convolve(self._pool(count, sides))
+            for term in program.dice_terms:
+                if not (term.plain and term.sign > 0):
+                    dist = dist.convolve(self._term(term))
+            dist = dist.shift(program.modifier)
+            self._store(key, dist)
+            return dist
+
+    def _plain_pools(self, program):
+        plain = {}
+        for term in program.dice_terms:
+            if term.plain and term.sign > 0 and term.count:
+                plain[term.sides] = plain.get(term.sides, 0) + term.count
+        return sorted(plain.items())
+
+    def _pool(self, count, sides):
+        key = f"{count}d{sides}"
+        dist = self._lookup(key)
+        if dist is not None:
+            return dist
+        smaller = [n for n in self._pools.get(sides, ()) if n < count]
+        if smaller:
+            base_count = max(smaller)
+            base = self._lookup(f"{base_count}d{sides}")
+            rest = self._lookup(f"{count - base_count}d{sides}")
+            if base is not None:
+                self.derived += 1
+                dist = base.convolve(rest) if rest is not None else base.add_die(sides, count - base_count)
+        if dist is None:
+            dist = dice_distribution(count, sides)
+        self._store(key, dist)
+        return dist
+
+    def _term(self, term):
+        key = str(term)[1:] # Cached unsigned, so '-1d4r1' reuses '1d4r1'
+        dist = self._lookup(key)
+        if dist is None:
+            dist = term_distribution(term)
+            if term.sign < 0:
+                dist = dist.negate()
+            self._store(key, dist)
+        return dist.negate() if term.sign < 0 else dist
+
+    def _lookup(self, key):
+        dist = self._entries.get(key)
+        if dist is not None:
+            self._entries.move_to_end(key)
+            return dist
+        if self._db is not None:
+            row = self._db.execute("SELECT data FROM distributions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                import json
+                self.disk_hits += 1
+                min_total, total, counts = json.loads(row[0])
+                dist = Distribution(min_total, counts, total)
+                self._remember(key, dist)
+                return dist
+        return None
+
+    def _store(self, key, dist):
+        self._remember(key, dist)
+        if self._db is not None:
+            import json
+            self._db.execute("INSERT OR REPLACE INTO distributions (key, data) VALUES (?, ?)",
+                             (key, json.dumps([dist.min_total, dist.total, dist.counts])))
+            self._db.commit()
+
+    def _remember(self, key, dist):
+        size = dist.nbytes()
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes()
+        self._entries[key] = dist
+        self.nbytes += size
+        pool_count, _, pool_sides = key.partition("d")
+        if pool_count.isdigit() and pool_sides.isdigit():
+            self._pools.setdefault(int(pool_sides), set()).add(int(pool_count))
+        while self.nbytes > self.max_bytes:
+            old_key, old = self._entries.popitem(last=False)
+            self.nbytes -= old.nbytes()
+            old_count, _, old_sides = old_key.partition("d")
+            if old_count.isdigit() and old_sides.isdigit():
+                self._pools[int(old_sides)].discard(int(old_count))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pools.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.disk_hits = self.derived = 0
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "derived": self.derived,
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+distribution_cache = DistributionCache()
+
+
+def configure_distribution_cache(max_bytes=16 << 20, path=None):
+    """Replaces the shared cache, e.g. to persist it to a sqlite file next to the app."""
+    global distribution_cache
+    distribution_cache.close()
+    distribution_cache = DistributionCache(max_bytes=max_bytes, path=path)
+    return distribution_cache
+
+
+def get_best_of_distribution(dice_notation, repeats, highest=True):
+    """Distribution of keeping the best (or worst) of `repeats` rolls of a notation."""
+    dist = get_distribution(dice_notation)
+    return dist.best_of(repeats) if highest else dist.worst_of(repeats)
+
+
+def get_distribution(dice_notation):
+    """Exact Distribution for a notation such as '2d6', '3d8+1d4' or '4d6kh3+2'."""
+    return distribution_cache.get(compile_notation(dice_notation))
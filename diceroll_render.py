@@ -0,0 +1,231 @@
+import io
+import os
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from diceroll_anim import pygame, DiceAnimator, DiceColor
+
+try:
+    from PIL import Image # Only needed for GIF/WebP output
+except ImportError:
+    Image = None
+
+FORMATS = ("png", "gif", "webp")
+
+
+def _surface_bytes(surface):
+    # pygame.image.tobytes replaced tostring in pygame 2.1.3
+    to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+    return to_bytes(surface, "RGB")
+
+
+def encode_frames(frames, fmt="png", frame_ms=66, final_ms=1500):
+    """Encodes Surfaces in memory.
+
+    'png' returns a list of PNG bytes, one per frame. 'gif' and 'webp'
+    return one looping animated image as bytes (needs Pillow); the
+    last frame is held for final_ms.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown clip format '{fmt}'. Expected one of: {', '.join(FORMATS)}")
+    if fmt == "png":
+        encoded = []
+        for frame in frames:
+            buffer = io.BytesIO()
+            pygame.image.save(frame, buffer, "frame.png")
+            encoded.append(buffer.getvalue())
+        return encoded
+    if Image is None:
+        raise ValueError(f"Writing '{fmt}' clips requires Pillow (pip install pillow)")
+    images = [Image.frombytes("RGB", frame.get_size(), _surface_bytes(frame)) for frame in frames]
+    durations = [frame_ms] * (len(images) - 1) + [final_ms]
+    buffer = io.BytesIO()
+    images[0].save(buffer, format=fmt.upper(), save_all=True, append_images=images[1:],
+                   duration=durations, loop=0)
+    return buffer.getvalue()
+
+
+def clip_key(roll_result, dice_color, style, fmt, settings):
+    """Everything that changes what a clip looks like. settings is HeadlessRenderer.render_settings()."""
+    return (roll_result["dice_notation"], tuple(roll_result["roll_details"]), roll_result["roll_result"],
+            roll_result.get("target"), roll_result.get("outcome_text"), dice_color, style, fmt, settings)
+
+
+def clip_nbytes(clip):
+    return sum(len(frame) for frame in clip) if isinstance(clip, list) else len(clip)
+
+
+class ClipCache:
+    """LRU of encoded clips bounded by an approximate byte budget."""
+
+    def __init__(self, max_bytes=64 << 20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._clips = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            clip = self._clips.get(key)
+            if clip is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._clips.move_to_end(key)
+            return clip
+
+    def put(self, key, clip):
+        with self._lock:
+            old = self._clips.pop(key, None)
+            if old is not None:
+                self.nbytes -= clip_nbytes(old)
+            self._clips[key] = clip
+            self.nbytes += clip_nbytes(clip)
+            while self.nbytes > self.max_bytes and len(self._clips) > 1:
+                _, evicted = self._clips.popitem(last=False)
+                self.nbytes -= clip_nbytes(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._clips.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "currsize": len(self._clips),
+        }
+
+
+class HeadlessRenderer(DiceAnimator):
+    """Renders roll animations to offscreen Surfaces, without a window or user input.
+
+    Uses SDL's dummy video driver unless another driver was chosen, and
+    draws with the same DieSprite code as DiceAnimator. Frames are
+    stepped at a fixed frame_rate rather than in real time, so a seeded
+    render is repeatable.
+    """
+
+    def __init__(self, window_width=600, window_height=400, dice_image_path="diceroll/images",
+                 frame_rate=15, clip_cache=None):
+        super().__init__(window_width, window_height, dice_image_path)
+        self.frame_rate = frame_rate
+        self.clip_cache = clip_cache if clip_cache is not None else ClipCache()
+        self.surface = None
+
+    def render_settings(self):
+        """The renderer settings a clip depends on: window size, frame rate, speed and image path."""
+        return (self.window_width, self.window_height, self.frame_rate, self.animation_speed, self.dice_image_path)
+
+    def _init_offscreen(self):
+        if self.surface is not None: return
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        self._init_pygame()
+        if pygame.display.get_surface() is None:
+            pygame.display.set_mode((1, 1)) # convert_alpha() needs a display pixel format
+        self.surface = pygame.Surface((self.window_width, self.window_height))
+        if self._load_raw_images():
+            self._process_images()
+
+    def render_frames(self, roll_result, dice_color=DiceColor.BLUE, style=None, seed=None):
+        """Returns the animation for an existing roll as Surfaces, ending on the settled dice."""
+        self._init_offscreen()
+        surface = self.surface
+        style = style or self.animation_style
+        dice_notation = roll_result["dice_notation"]
+        target = roll_result.get("target")
+        dice_and_target_text = f"{dice_notation}" + (f" (Target: {target})" if target else "")
+
+        dice_color = self._resolve_dice_color(dice_color)
+        all_dice_defs = self._displayable_dice(dice_notation, dice_color, roll_result) if self.images_processed else None
+        if not all_dice_defs:
+            self._draw_text_only(surface, roll_result, dice_and_target_text)
+            return [surface.copy()]
+
+        dice_list = self._layout_dice(roll_result, dice_color, all_dice_defs, random.Random(seed))
+        title_render, title_rect = self._title(dice_and_target_text)
+        num_frames = max(1, round(self.frame_rate / self.animation_speed))
+        frames = []
+        for i in range(num_frames):
+            surface.fill((255, 255, 255))
+            surface.blit(title_render, title_rect)
+            for die in dice_list:
+                die.update_animation(style, i / num_frames)
+                die.draw_animated(surface)
+            frames.append(surface.copy())
+        self._draw_final(surface, roll_result, dice_list, title_render, title_rect)
+        frames.append(surface.copy())
+        return frames
+
+    def render_clip(self, roll_result, dice_color=DiceColor.BLUE, style=None, fmt="gif", seed=None):
+        """Encoded clip for a roll (see encode_frames), served from clip_cache when possible."""
+        style = style or self.animation_style
+        key = clip_key(roll_result, dice_color, style, fmt, self.render_settings())
+        clip = self.clip_cache.get(key)
+        if clip is None:
+            frames = self.render_frames(roll_result, dice_color, style, seed)
+            clip = encode_frames(frames, fmt, int(1000 / self.frame_rate))
+            self.clip_cache.put(key, clip)
+        return clip
+
+
+# --- Parallel rendering ---
+
+_worker_renderer = None
+
+
+def _init_worker(window_width, window_height, frame_rate, animation_speed, dice_image_path):
+    global _worker_renderer
+    # Worker-side cache stays empty; the parent process owns the shared one
+    _worker_renderer = HeadlessRenderer(window_width, window_height, dice_image_path, frame_rate, ClipCache(0))
+    _worker_renderer.set_animation_speed(animation_speed)
+
+
+def _render_job(roll_result, dice_color, style, fmt, seed):
+    return _worker_renderer.render_clip(roll_result, dice_color, style, fmt, seed)
+
+
+def render_many(jobs, fmt="gif", workers=None, renderer=None, seed=None):
+    """Renders clips for many rolls across worker processes.
+
+    jobs is a list of (roll_result, dice_color, style) tuples; the clips
+    come back in the same order. Clips already in the renderer's cache
+    are not rendered again, and new ones are added to it. Call from under
+    an `if __name__ == "__main__":` guard on platforms that spawn worker
+    processes.
+    """
+    renderer = renderer or HeadlessRenderer()
+    cache = renderer.clip_cache
+    settings = renderer.render_settings()
+    clips = [None] * len(jobs)
+    misses = {} # key -> indexes of jobs waiting for it
+    for i, (roll_result, dice_color, style) in enumerate(jobs):
+        style = style or renderer.animation_style
+        key = clip_key(roll_result, dice_color, style, fmt, settings)
+        clips[i] = cache.get(key)
+        if clips[i] is None:
+            misses.setdefault(key, []).append(i)
+    if not misses:
+        return clips
+
+    rng = random.Random(seed)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=settings) as executor:
+        futures = {}
+        for key, indexes in misses.items():
+            roll_result, dice_color, style = jobs[indexes[0]]
+            futures[key] = executor.submit(_render_job, roll_result, dice_color, style or renderer.animation_style,
+                                           fmt, rng.getrandbits(64))
+        for key, future in futures.items():
+            clip = future.result()
+            cache.put(key, clip)
+            for i in misses[key]:
+                clips[i] = clip
+    return clips
@@ -0,0 +1,122 @@
+import random
+import threading
+
+BACKENDS = ("python", "numpy", "secrets")
+
+
+def fast_randint(getrandbits):
+    """randint(a, b) by rejection sampling on getrandbits, without random.randint's call layers."""
+    def randint(a, b):
+        n = b - a + 1
+        k = (n - 1).bit_length()
+        r = getrandbits(k)
+        while r >= n:
+            r = getrandbits(k)
+        return a + r
+    return randint
+
+
+class BufferedBits:
+    """getrandbits() served from a NumPy generator, a block of 32-bit words at a time."""
+
+    def __init__(self, generator, block=4096):
+        self.generator = generator
+        self.block = block
+        self.words = []
+        self.pos = 0
+
+    def getrandbits(self, k):
+        if k > 32:
+            return int.from_bytes(self.generator.bytes((k + 7) // 8), "little") >> (-k % 8)
+        if self.pos >= len(self.words):
+            self.words = self.generator.integers(0, 1 << 32, size=self.block, dtype="uint32").tolist()
+            self.pos = 0
+        word = self.words[self.pos]
+        self.pos += 1
+        return word >> (32 - k)
+
+
+class RandomStreams:
+    """Hands every thread its own random stream, so rolls never share RNG state.
+
+    backend picks the generator behind single rolls:
+      'python'  - random.Random (Mersenne Twister), getrandbits rejection sampling
+      'numpy'   - NumPy PCG64, buffered, for single and bulk rolls
+      'secrets' - the OS CSPRNG for audited rolls; cannot be seeded
+    With a seed, the n-th thread to roll gets a stream derived from
+    (seed, n): reproducible as long as threads start rolling in the same
+    order. NumPy streams are spawned from one SeedSequence.
+    """
+
+    def __init__(self, seed=None, backend="python"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown RNG backend '{backend}'. Expected one of: {', '.join(BACKENDS)}")
+        if backend == "secrets" and seed is not None:
+            raise ValueError("The 'secrets' RNG backend draws from the OS and cannot be seeded")
+        if backend == "numpy":
+            from diceroll_bulk import np
+            if np is None:
+                raise ValueError("The 'numpy' RNG backend requires NumPy")
+        self.seed = seed
+        self.backend = backend
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._spawned = 0
+        self._seed_seq = None
+
+    def _next_index(self):
+        with self._lock:
+            index = self._spawned
+            self._spawned += 1
+            return index
+
+    def _numpy_generator(self):
+        from diceroll_bulk import np # NumPy is only imported once it is used
+        with self._lock:
+            if self._seed_seq is None:
+                self._seed_seq = np.random.SeedSequence(self.seed)
+            child = self._seed_seq.spawn(1)[0]
+        return np.random.Generator(np.random.PCG64(child))
+
+    def python(self):
+        """The calling thread's random.Random (random.SystemRandom for 'secrets')."""
+        rng = getattr(self._local, "python", None)
+        if rng is None:
+            if self.backend == "secrets":
+                rng = random.SystemRandom()
+            else:
+                index = self._next_index()
+                rng = random.Random() if self.seed is None else random.Random(f"{self.seed}/{index}")
+            self._local.python = rng
+        return rng
+
+    def randint(self):
+        """The calling thread's randint(a, b) for single rolls."""
+        randint = getattr(self._local, "randint", None)
+        if randint is None:
+            if self.backend == "secrets":
+                import secrets
+                randbelow = secrets.randbelow
+                randint = lambda a, b: a + randbelow(b - a + 1)
+            elif self.backend == "numpy":
+                randint = fast_randint(BufferedBits(self._numpy_generator()).getrandbits)
+            else:
+                randint = fast_randint(self.python().getrandbits)
+            self._local.randint = randint
+        return randint
+
+    def bulk(self):
+        """The calling thread's generator for roll_many (NumPy when available)."""
+        rng = getattr(self._local, "bulk", None)
+        if rng is None:
+            if self.backend == "secrets":
+                rng = random.SystemRandom()
+            else:
+                from diceroll_bulk import np
+                if np is not None:
+                    rng = self._numpy_generator()
+                else:
+                    index = self._next_index()
+                    rng = random.Random() if self.seed is None else random.Random(f"{self.seed}/bulk/{index}")
+            self._local.bulk = rng
+        return rng
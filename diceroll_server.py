@@ -0,0 +1,289 @@
+"""Standalone HTTP/JSON roll service built on dicerollAPI (stdlib asyncio only).
+
+    python diceroll_server.py [--host 127.0.0.1] [--port 8765] [--seed N]
+
+Endpoints (HTTP/1.1, keep-alive):
+    POST /roll            {"rolls": [{"notation": "2d6", "target": 8}, "1d20", ...]}
+                          or JSON lines (one request object per line), answered in kind
+    GET  /last_5_rolls
+    GET  /roll_statistics?notation=3d6&num_rolls=10000
+    GET  /health
+
+Rolls of the same notation arriving within batch_window seconds, from
+any connection, are drawn together through DiceRoller.roll_dice_batch,
+off the event loop. Requests are limited in rolls and in total dice.
+"""
+import argparse
+import asyncio
+import json
+from urllib.parse import urlsplit, parse_qs
+from diceroll_api import dicerollAPI
+from diceroll_notation import compile_notation
+
+MAX_BODY = 16 << 20
+MAX_STATISTICS_ROLLS = 10_000_000
+MAX_STATISTICS_DICE = 100_000_000 # num_rolls x dice per roll for /roll_statistics
+MAX_REQUEST_ROLLS = 100_000 # Rolls per /roll request, counting 'count'
+MAX_REQUEST_DICE = 1_000_000 # Dice per /roll request, over all its rolls
+JSON_LINES_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+def _json_default(value):
+    # NumPy scalars and arrays from the bulk paths
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _RollBatcher:
+    """Coalesces single rolls from concurrent requests into one batch per notation."""
+
+    def __init__(self, dice_roller, batch_window=0.002, max_batch=4096):
+        self.dice_roller = dice_roller
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.rolls = 0
+        self._pending = {} # notation -> [(target, future)]
+        self._size = 0
+        self._timer = None
+        self._tasks = set() # Batches rolling in the executor
+
+    def submit(self, dice_notation, target=None):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(dice_notation, []).append((target, future))
+        self._size += 1
+        if self._size >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window, self.flush)
+        return future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._size = self._pending, {}, 0
+        if pending:
+            task = asyncio.get_running_loop().create_task(self._roll_pending(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _roll_pending(self, pending):
+        # Rolled in the default executor so a large batch does not stall the event loop
+        loop = asyncio.get_running_loop()
+        for dice_notation, waiters in pending.items():
+            try:
+                results = await loop.run_in_executor(None, self.dice_roller.roll_dice_batch, dice_notation,
+                                                     [target for target, _ in waiters])
+            except ValueError as e:
+                results = [{"dice_notation": dice_notation, "error": str(e)}] * len(waiters)
+            except Exception as e:
+                # Nothing else awaits this task, so the waiting requests must be failed here
+                for _, future in waiters:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rolls += len(waiters)
+            for (_, future), result in zip(waiters, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+def _roll_requests(payload):
+    """Normalizes a /roll body into (notation, target) pairs."""
+    if isinstance(payload, dict):
+        payload = payload["rolls"] if "rolls" in payload else [payload]
+    if not isinstance(payload, list):
+        raise ValueError("Expected a roll request object or a list of them")
+    requests = []
+    num_dice = 0
+    for item in payload:
+        if isinstance(item, str):
+            notation, target, count = item, None, 1
+        else:
+            if not isinstance(item, dict) or not isinstance(item.get("notation"), str):
+                raise ValueError(f"Each roll needs a 'notation' string: {item!r}")
+            notation = item["notation"]
+            target = item.get("target")
+            if target is not None and (isinstance(target, bool) or not isinstance(target, int)):
+                raise ValueError(f"'target' must be an integer: {item!r}")
+            count = item.get("count", 1)
+            if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+                raise ValueError(f"'count' must be a positive integer: {item!r}")
+        # Checked before the list grows, so a huge 'count' is refused without allocating it
+        if len(requests) + count > MAX_REQUEST_ROLLS:
+            raise ValueError(f"At most {MAX_REQUEST_ROLLS} rolls per request")
+        try:
+            num_dice += compile_notation(notation).num_dice * count
+        except ValueError:
+            pass # Answered per roll with the notation error by the batcher
+        if num_dice > MAX_REQUEST_DICE:
+            raise ValueError(f"At most {MAX_REQUEST_DICE} dice per request")
+        requests.extend([(notation, target)] * count)
+    return requests
+
+
+class RollServer:
+    """asyncio HTTP server exposing one shared dicerollAPI."""
+
+    def __init__(self, api=None, host="127.0.0.1", port=8765, batch_window=0.002, max_batch=4096):
+        self.api = api or dicerollAPI()
+        self.host = host
+        self.port = port
+        self.batcher = _RollBatcher(self.api.dice_roller, batch_window, max_batch)
+        self.requests = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1] # Resolves port=0
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                if not request_line.strip():
+                    continue # Stray CRLF between requests
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError("Negative Content-Length")
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request"}, keep_alive=False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version != "HTTP/1.0" or connection == "keep-alive")
+
+                self.requests += 1
+                status, payload, json_lines = await self._dispatch(method, target, headers, body)
+                await self._respond(writer, status, payload, keep_alive, json_lines)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive=True, json_lines=False):
+        if json_lines:
+            body = "".join(json.dumps(item, default=_json_default) + "\n" for item in payload).encode()
+            content_type = "application/x-ndjson"
+        else:
+            body = json.dumps(payload, default=_json_default).encode()
+            content_type = "application/json"
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _dispatch(self, method, target, headers, body):
+        """Returns (status, payload, json_lines)."""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == "/roll":
+                if method != "POST":
+                    return 405, {"error": "Use POST for /roll"}, False
+                return await self._roll(headers, body)
+            if method != "GET":
+                return 405, {"error": f"Use GET for {url.path}"}, False
+            if url.path == "/last_5_rolls":
+                return 200, self.api.get_last_5_rolls(), False
+            if url.path == "/roll_statistics":
+                return 200, await self._statistics(query), False
+            if url.path == "/health":
+                return 200, {"status": "ok", "requests": self.requests, "batches": self.batcher.batches,
+                             "rolls": self.batcher.rolls}, False
+            return 404, {"error": f"Unknown path: {url.path}"}, False
+        except ValueError as e:
+            return 400, {"error": str(e)}, False
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}, False
+
+    async def _roll(self, headers, body):
+        text = body.decode("utf-8")
+        json_lines = headers.get("content-type", "").split(";")[0].strip() in JSON_LINES_TYPES
+        try:
+            if json_lines:
+                payload = [json.loads(line) for line in text.splitlines() if line.strip()]
+            else:
+                payload = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}") from None
+        futures = [self.batcher.submit(notation, target) for notation, target in _roll_requests(payload)]
+        results = await asyncio.gather(*futures)
+        return 200, (results if json_lines else {"results": results}), json_lines
+
+    async def _statistics(self, query):
+        if "notation" not in query:
+            raise ValueError("Missing 'notation' query parameter")
+        dice_notation = query["notation"]
+        num_rolls = int(query.get("num_rolls", 10000))
+        if not 0 < num_rolls <= MAX_STATISTICS_ROLLS:
+            raise ValueError(f"num_rolls must be between 1 and {MAX_STATISTICS_ROLLS}")
+        if compile_notation(dice_notation).num_dice * num_rolls > MAX_STATISTICS_DICE:
+            raise ValueError(f"num_rolls x dice per roll must be at most {MAX_STATISTICS_DICE}")
+        loop = asyncio.get_running_loop()
+        # Large simulations run off the event loop so rolls keep being served
+        statistics = await loop.run_in_executor(None, self.api.dice_roller.get_roll_statistics, dice_notation, num_rolls)
+        statistics["frequency"] = {str(total): int(count) for total, count in statistics["frequency"].items()}
+        return statistics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch-window", type=float, default=0.002, help="Seconds to wait for rolls to batch together")
+    args = parser.parse_args(argv)
+
+    server = RollServer(dicerollAPI(seed=args.seed), args.host, args.port, args.batch_window)
+
+    async def run():
+        await server.start()
+        print(f"Roll server listening on http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
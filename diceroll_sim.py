@@ -0,0 +1,94 @@
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from statistics import NormalDist
+from diceroll_notation import compile_notation
+from diceroll_bulk import make_rng, roll_many, histogram
+from diceroll_stats import RollStats
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_SHARD_SIZE = 1 << 18
+
+
+def _shard_seeds(seed, num_shards):
+    """Independent per-shard seeds: SeedSequence children with NumPy, derived strings without."""
+    if np is not None:
+        return np.random.SeedSequence(seed).spawn(num_shards)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    return [f"{seed}/shard/{i}" for i in range(num_shards)]
+
+
+def simulate_shard(dice_notation, num_rolls, seed):
+    """Rolls one shard and returns its RollStats. Runs in a worker process."""
+    totals, _ = roll_many(compile_notation(dice_notation), num_rolls, rng=make_rng(seed))
+    return RollStats().add_counts(histogram(totals))
+
+
+def simulate(dice_notation, num_rolls, workers=None, seed=None, shard_size=DEFAULT_SHARD_SIZE,
+             ci_width=None, confidence=0.95):
+    """Monte Carlo statistics for a notation, sharded across worker processes.
+
+    Shards use independent seeded streams and return RollStats
+    accumulators that are merged together. If ci_width is given, sampling stops early once the
+    confidence interval on the mean is at most that wide. The result has
+    the get_roll_statistics keys plus 'ci_low', 'ci_high' and
+    'stopped_early'; 'num_rolls' is the number of rolls actually made.
+
+    Call from under an `if __name__ == "__main__":` guard on platforms
+    that spawn worker processes.
+    """
+    compile_notation(dice_notation) # Fail fast on bad notation before starting workers
+    sizes = [shard_size] * (num_rolls // shard_size)
+    if num_rolls % shard_size:
+        sizes.append(num_rolls % shard_size)
+    seeds = _shard_seeds(seed, len(sizes))
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    stats = RollStats()
+    stopped_early = False
+
+    def converged():
+        return stats.count > 1 and 2 * z * math.sqrt(stats.variance / stats.count) <= ci_width
+
+    if workers == 1 or len(sizes) <= 1:
+        for size, shard_seed in zip(sizes, seeds):
+            stats.merge(simulate_shard(dice_notation, size, shard_seed))
+            if ci_width is not None and converged():
+                stopped_early = True
+                break
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            max_in_flight = 2 * workers # Small window so early stopping wastes little work
+            shards = iter(zip(sizes, seeds))
+            pending = set()
+            for size, shard_seed in shards:
+                pending.add(executor.submit(simulate_shard, dice_notation, size, shard_seed))
+                if len(pending) >= max_in_flight:
+                    break
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.merge(future.result())
+                if ci_width is not None and converged():
+                    for future in pending:
+                        future.cancel()
+                    stopped_early = True
+                    break
+                for size, shard_seed in shards:
+                    pending.add(executor.submit(simulate_shard, dice_notation, size, shard_seed))
+                    if len(pending) >= max_in_flight:
+                        break
+
+    statistics = stats.as_statistics(dice_notation)
+    half_width = z * math.sqrt(stats.variance / stats.count) if stats.count else 0
+    statistics["ci_low"] = statistics["average"] - half_width
+    statistics["ci_high"] = statistics["average"] + half_width
+    statistics["stopped_early"] = stopped_early and stats.count < num_rolls
+    return statistics
@@ -0,0 +1,107 @@
+import math
+
+
+class RollStats:
+    """Streaming statistics over roll totals.
+
+    Keeps a running count, Welford mean/variance, min/max and a
+    frequency table, so memory is O(distinct totals) however many rolls
+    are fed in. Accumulators from different workers or time windows can
+    be merged.
+    """
+    __slots__ = ("count", "mean", "m2", "min", "max", "frequency")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0 # Sum of squared deviations from the mean
+        self.min = None
+        self.max = None
+        self.frequency = {}
+
+    def add(self, total):
+        self.count += 1
+        delta = total - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (total - self.mean)
+        if self.min is None or total < self.min:
+            self.min = total
+        if self.max is None or total > self.max:
+            self.max = total
+        self.frequency[total] = self.frequency.get(total, 0) + 1
+
+    def update(self, totals):
+        """Feeds any iterable or generator of totals."""
+        for total in totals:
+            self.add(total)
+        return self
+
+    def add_counts(self, frequency):
+        """Feeds a histogram {total: count}, e.g. from a vectorized batch."""
+        for value, count in frequency.items():
+            if count:
+                self._combine(count, float(value), 0.0, value, value)
+                self.frequency[value] = self.frequency.get(value, 0) + count
+        return self
+
+    def merge(self, other):
+        """Folds another RollStats into this one (Chan et al. pairwise update)."""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+            for value, count in other.frequency.items():
+                self.frequency[value] = self.frequency.get(value, 0) + count
+        return self
+
+    def _combine(self, count, mean, m2, low, high):
+        total_count = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total_count
+        self.m2 += m2 + delta * delta * self.count * count / total_count
+        self.count = total_count
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+
+    @property
+    def variance(self):
+        """Sample variance."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    def percentile(self, p):
+        """Nearest-rank percentile (0-100) read off the frequency table."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for value in sorted(self.frequency):
+            seen += self.frequency[value]
+            if seen >= rank:
+                return value
+        return self.max
+
+    def percentiles(self, ps=(5, 25, 50, 75, 95)):
+        return {p: self.percentile(p) for p in ps}
+
+    def as_statistics(self, dice_notation):
+        """The dict shape returned by get_roll_statistics."""
+        return {
+            "dice_notation": dice_notation,
+            "num_rolls": self.count,
+            "average": self.mean if self.count else 0,
+            "min": self.min if self.count else 0,
+            "max": self.max if self.count else 0,
+            "frequency": dict(sorted(self.frequency.items())),
+            "stddev": self.stddev,
+            "median": self.percentile(50) if self.count else 0,
+        }
+
+    def __getstate__(self):
+        return (self.count, self.mean, self.m2, self.min, self.max, self.frequency)
+
+    def __setstate__(self, state):
+        self.count, self.mean, self.m2, self.min, self.max, self.frequency = state
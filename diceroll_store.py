@@ -0,0 +1,289 @@
+import json
+import mmap
+import operator
+import os
+import time
+from array import array
+from diceroll_history import HistorySink
+
+# Bits in the 'flags' column
+HAS_TARGET = 1
+SUCCESS = 2
+HAS_EXTRA = 4
+
+# Column name -> array typecode. Each column is a raw native-endian file.
+COLUMNS = {
+    "timestamp": "d",
+    "notation_id": "I",
+    "total": "i",
+    "target": "i",
+    "flags": "B",
+    "offset": "Q", # Start of this roll's values in the 'dice' column
+    "dice": "H",
+}
+# outcome_text is only packed when it is the "Success"/"Failure" the flags rebuild
+PACKED_KEYS = {"dice_notation", "roll_result", "roll_details", "target", "success", "outcome_text"}
+
+
+def _int32(value):
+    """value as an int if it fits a signed 32-bit column, else None."""
+    try:
+        value = operator.index(value)
+    except TypeError:
+        return None
+    return value if -(1 << 31) <= value < (1 << 31) else None
+
+
+class _Column:
+    """An append-only typed column: a loaded or memory-mapped base plus an in-memory tail."""
+
+    def __init__(self, file_path, typecode, use_mmap):
+        self.file_path = file_path
+        self.typecode = typecode
+        self.tail = array(typecode)
+        self.flushed = 0 # Items of tail already written to the file
+        self._mmap = None
+        self._raw_view = None
+        self.base = array(typecode)
+        if os.path.exists(file_path) and os.path.getsize(file_path):
+            with open(file_path, "rb") as file:
+                if use_mmap:
+                    self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._raw_view = memoryview(self._mmap)
+                    self.base = self._raw_view.cast(typecode)
+                else:
+                    self.base.frombytes(file.read())
+
+    def __len__(self):
+        return len(self.base) + len(self.tail)
+
+    def __getitem__(self, index):
+        base_len = len(self.base)
+        if index < base_len:
+            return self.base[index]
+        return self.tail[index - base_len]
+
+    def slice(self, start, stop):
+        base_len = len(self.base)
+        if stop <= base_len:
+            return self.base[start:stop].tolist()
+        if start >= base_len:
+            return self.tail[start - base_len:stop - base_len].tolist()
+        return self.base[start:].tolist() + self.tail[:stop - base_len].tolist()
+
+    def append(self, value):
+        self.tail.append(value)
+
+    def extend(self, values):
+        self.tail.extend(values)
+
+    def flush(self):
+        if self.flushed < len(self.tail):
+            with open(self.file_path, "ab") as file:
+                file.write(self.tail[self.flushed:].tobytes())
+            self.flushed = len(self.tail)
+
+    def close(self):
+        if self._mmap is not None:
+            self.base.release()
+            self._raw_view.release()
+            self._mmap.close()
+            self._raw_view = None
+            self._mmap = None
+            self.base = array(self.typecode)
+
+
+class RollStore(HistorySink):
+    """Compact columnar roll history, usable as a DiceRoller history_sink.
+
+    Notations are interned into a table; totals, targets, flags, timestamps
+    and die values live in typed arrays, so a roll costs roughly 30 bytes
+    plus 2 bytes per die instead of a dict. With a directory path the store
+    is persisted as one raw file per column that is appended to on flush()
+    and can be memory-mapped on open (use_mmap=True). Rows are read back as
+    ordinary roll dicts, built only when accessed.
+    """
+
+    def __init__(self, path=None, use_mmap=False, flush_every=4096):
+        self.path = path
+        self.flush_every = flush_every
+        self.notations = []
+        self.notation_ids = {}
+        self.extras = {} # Row index -> keys that are not packed into columns
+        self._pending_extras = []
+        self._pending_notations = []
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._load_side_tables()
+        self.columns = {name: _Column(self._column_path(name), typecode, use_mmap and path is not None)
+                        for name, typecode in COLUMNS.items()}
+        self._total = self.columns["total"]
+        self._unflushed = 0
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.{COLUMNS[name]}") if self.path else ""
+
+    def _load_side_tables(self):
+        notations_path = os.path.join(self.path, "notations.txt")
+        if os.path.exists(notations_path):
+            with open(notations_path, "r") as file:
+                for line in file:
+                    self._intern_loaded(json.loads(line))
+        extras_path = os.path.join(self.path, "extras.jsonl")
+        if os.path.exists(extras_path):
+            with open(extras_path, "r") as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.extras[entry["i"]] = entry["extra"]
+
+    def _intern_loaded(self, notation):
+        self.notation_ids[notation] = len(self.notations)
+        self.notations.append(notation)
+
+    def intern(self, notation):
+        notation_id = self.notation_ids.get(notation)
+        if notation_id is None:
+            notation_id = len(self.notations)
+            self._intern_loaded(notation)
+            self._pending_notations.append(notation)
+        return notation_id
+
+    # --- HistorySink interface ---
+
+    def write(self, roll_data):
+        self.append(roll_data)
+        self._unflushed += 1
+        if self.path is not None and self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.path is None:
+            return
+        for column in self.columns.values():
+            column.flush()
+        if self._pending_notations:
+            with open(os.path.join(self.path, "notations.txt"), "a") as file:
+                file.writelines(json.dumps(n) + "\n" for n in self._pending_notations)
+            self._pending_notations = []
+        if self._pending_extras:
+            with open(os.path.join(self.path, "extras.jsonl"), "a") as file:
+                file.writelines(json.dumps({"i": i, "extra": self.extras[i]}) + "\n"
+                                for i in self._pending_extras)
+            self._pending_extras = []
+        self._unflushed = 0
+
+    def close(self):
+        self.flush()
+        for column in self.columns.values():
+            column.close()
+
+    # --- Writing ---
+
+    def append(self, roll_data, timestamp=None):
+        columns = self.columns
+        index = len(self._total)
+        flags = 0
+        target = roll_data.get("target")
+        if target is not None:
+            flags |= HAS_TARGET
+            if roll_data.get("success"):
+                flags |= SUCCESS
+        extra = {key: value for key, value in roll_data.items() if key not in PACKED_KEYS}
+        if target is None and "success" in roll_data:
+            extra["success"] = roll_data["success"]
+        outcome_text = roll_data.get("outcome_text")
+        if outcome_text is not None and (target is None or outcome_text != ("Success" if flags & SUCCESS else "Failure")):
+            extra["outcome_text"] = outcome_text # e.g. an OutcomeRules tier
+
+        # Values the typed columns cannot hold (float targets, huge dice) go to extras,
+        # and everything is checked before any column changes
+        total = _int32(roll_data["roll_result"])
+        if total is None:
+            extra["roll_result"] = roll_data["roll_result"]
+        packed_target = _int32(target) if target is not None else 0
+        if packed_target is None:
+            extra["target"] = target
+        try:
+            dice = array("H", roll_data["roll_details"])
+        except (OverflowError, TypeError):
+            dice = array("H")
+            extra["roll_details"] = list(roll_data["roll_details"])
+        if extra:
+            flags |= HAS_EXTRA
+
+        offset = len(columns["dice"])
+        columns["dice"].extend(dice)
+        columns["offset"].append(offset)
+        columns["timestamp"].append(time.time() if timestamp is None else timestamp)
+        columns["notation_id"].append(self.intern(roll_data["dice_notation"]))
+        columns["total"].append(total or 0)
+        columns["target"].append(packed_target or 0)
+        columns["flags"].append(flags)
+        if extra:
+            self.extras[index] = extra
+            self._pending_extras.append(index)
+
+    def extend(self, roll_history):
+        for roll_data in roll_history:
+            self.write(roll_data)
+
+    # --- Reading ---
+
+    def __len__(self):
+        return len(self._total)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.get_roll(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("roll index out of range")
+        return self.get_roll(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get_roll(i)
+
+    def get_roll(self, index):
+        """Builds the roll dict for one row."""
+        columns = self.columns
+        start = columns["offset"][index]
+        stop = columns["offset"][index + 1] if index + 1 < len(self) else len(columns["dice"])
+        roll_data = {
+            "dice_notation": self.notations[columns["notation_id"][index]],
+            "roll_result": columns["total"][index],
+            "roll_details": columns["dice"].slice(start, stop)
+        }
+        flags = columns["flags"][index]
+        if flags & HAS_TARGET:
+            roll_data["target"] = columns["target"][index]
+            roll_data["success"] = bool(flags & SUCCESS)
+        if flags & HAS_EXTRA:
+            roll_data.update(self.extras[index])
+        if flags & HAS_TARGET and "outcome" not in roll_data and "outcome_text" not in roll_data:
+            roll_data["outcome_text"] = "Success" if flags & SUCCESS else "Failure"
+        return roll_data
+
+    def timestamp(self, index):
+        return self.columns["timestamp"][index]
+
+    def totals(self):
+        totals = self._total.slice(0, len(self))
+        for index, extra in self.extras.items():
+            if "roll_result" in extra: # Too large for the column
+                totals[index] = extra["roll_result"]
+        return totals
+
+
+def save_roll_store(path, roll_history):
+    """Writes an iterable of roll dicts to a columnar store directory, replacing its contents."""
+    if os.path.isdir(path):
+        for name in [f"{name}.{typecode}" for name, typecode in COLUMNS.items()] + ["notations.txt", "extras.jsonl"]:
+            if os.path.exists(os.path.join(path, name)):
+                os.remove(os.path.join(path, name))
+    store = RollStore(path, flush_every=1 << 16)
+    store.extend(roll_history)
+    store.close()
+    return store